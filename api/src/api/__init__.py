@@ -1,11 +1,15 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from .exceptions import (
     ValidationError,
     AuthenticationError,
-    AccessError
+    AccessError,
+    RateLimitError,
+    PayloadTooLargeError
 )
+from .dependencies import rate_limit
 from .routes import (
     home_router,
+    metrics_router,
     models_router,
     chat_router,
     image_router,
@@ -16,9 +20,10 @@ from .routes import (
 
 class RouterManager:
     def __init__(self):
-        self.main_router = APIRouter()
+        self.main_router = APIRouter(dependencies=[Depends(rate_limit)])
         self.routers = [
             home_router,
+            metrics_router,
             models_router,
             chat_router,
             image_router,
@@ -39,5 +44,7 @@ __all__ = [
     'main_router',
     'ValidationError',
     'AuthenticationError',
-    'AccessError'
+    'AccessError',
+    'RateLimitError',
+    'PayloadTooLargeError'
 ]
\ No newline at end of file
@@ -1,9 +1,13 @@
+import hmac
 import time
 from fastapi import Request, Depends
-from typing import Set
-from .exceptions import AuthenticationError, AccessError, ValidationError
-from ..core import user_manager
+from pydantic import BaseModel
+from typing import AbstractSet, Any, Type
+from .exceptions import AuthenticationError, AccessError, ValidationError, RateLimitError
+from .multipart import MultipartBody
+from ..core import user_manager, rate_limiter, metrics, settings
 from ..providers import BaseProvider
+from ..utils import request_processor
 
 class AuthenticationHandler:
     @staticmethod
@@ -27,6 +31,40 @@ class AuthenticationHandler:
         
         return user
 
+    @staticmethod
+    def _validate_metrics_access(request: Request) -> None:
+        # Without a configured token, metrics are only served to local scrapers.
+        if not settings.metrics_token:
+            if not request.client or request.client.host not in ('127.0.0.1', '::1'):
+                raise AuthenticationError('Metrics are only available locally.', status_code=403)
+            return
+
+        token = request.headers.get('Authorization', '').replace('Bearer ', '')
+        if not hmac.compare_digest(token.encode(), settings.metrics_token.encode()):
+            raise AuthenticationError('You need to provide a valid metrics token.')
+
+class RateLimitHandler:
+    @staticmethod
+    def _get_key(request: Request) -> str:
+        key = request_processor.get_api_key(request)
+        if key != 'none':
+            return key
+
+        client_ip = request.headers.get('CF-Connecting-IP') or (request.client.host if request.client else '')
+        return f'ip:{client_ip}'
+
+    @staticmethod
+    def _get_tier(key: str) -> int:
+        user = user_manager.cache.peek(key)
+        if user:
+            return user.get('premium_tier', 0)
+
+        if key.startswith('ip:') or user_manager.cache.is_unknown(key):
+            return 0
+
+        # Not looked up yet: allow the most generous tier until the user is cached.
+        return max(rate_limiter.config.tiers)
+
 class UserAccessHandler:
     @staticmethod
     async def _check_premium_status(user: dict) -> None:
@@ -47,32 +85,12 @@ class UserAccessHandler:
                 raise AccessError('Your IP is different than the locked one.')
 
 class RequestValidator:
-    @staticmethod
-    def _get_model_sets() -> tuple[Set[str], Set[str], Set[str]]:
-        providers = BaseProvider.__subclasses__()
-        all_models = set(BaseProvider.get_all_models())
-        paid_models = {
-            model for provider in providers
-            for model in provider.config.paid_models
-        }
-        return all_models, paid_models
-
-    @staticmethod
-    async def _get_request_body(request: Request) -> dict:
-        try:
-            if request.headers.get('Content-Type') == 'application/json':
-                return await request.json()
-            elif request.headers.get('Content-Type').startswith('multipart/form-data'):
-                return await request.form()
-        except Exception:
-            raise ValidationError('Invalid body.')
-
     @staticmethod
     def _validate_model_access(
         model: str,
         user_tier: int,
-        all_models: Set[str],
-        paid_models: Set[str],
+        all_models: AbstractSet[str],
+        paid_models: AbstractSet[str],
     ) -> None:
         if model not in all_models:
             raise ValidationError(f'The model `{model}` does not exist.')
@@ -81,29 +99,53 @@ class RequestValidator:
            raise ValidationError(f'You don\'t have permission to use `{model}`.')
 
 async def authentication(request: Request) -> None:
+    start = time.perf_counter()
     key = await AuthenticationHandler._get_api_key(request)
     user = await AuthenticationHandler._validate_user(key)
     request.state.user = user
+    metrics.phase_duration.observe(time.perf_counter() - start, 'auth')
+
+async def metrics_authentication(request: Request) -> None:
+    AuthenticationHandler._validate_metrics_access(request)
+
+async def rate_limit(request: Request) -> None:
+    key = RateLimitHandler._get_key(request)
+    retry_after = await rate_limiter.hit(key, RateLimitHandler._get_tier(key))
+    if retry_after > 0:
+        raise RateLimitError(retry_after)
 
 async def validate_user_access(request: Request) -> None:
     user = request.state.user
     await UserAccessHandler._check_premium_status(user)
     await UserAccessHandler._validate_ip(request, user)
 
-async def validate_request_body(request: Request) -> None:
-    body = await RequestValidator._get_request_body(request)
-    model = body.get('model')
-    all_models, paid_models = RequestValidator._get_model_sets()
+def validate_model(request: Request, model: str) -> None:
+    registry = BaseProvider.get_registry()
     
     RequestValidator._validate_model_access(
         model=model,
         user_tier=request.state.user.get('premium_tier', 0),
-        all_models=all_models,
-        paid_models=paid_models
+        all_models=registry.all_models,
+        paid_models=registry.paid_models
     )
 
+def validated_body(body_class: Type[BaseModel]) -> Any:
+    async def validate_request_body(request: Request, data: body_class) -> BaseModel:
+        validate_model(request, data.model)
+        return data
+
+    return Depends(validate_request_body)
+
+async def validate_multipart_model(request: Request) -> MultipartBody:
+    body = MultipartBody(request)
+    model = await body.read_field('model')
+    if not model:
+        raise ValidationError('The model field is required.')
+
+    validate_model(request, model)
+    return body
+
 DEPENDENCIES = [
     Depends(authentication),
-    Depends(validate_user_access),
-    Depends(validate_request_body)
+    Depends(validate_user_access)
 ]
\ No newline at end of file
@@ -26,4 +26,17 @@ class ValidationError(Exception):
     def __init__(self, message: str):
         self.status_code = 400
         self.message = message
+        super().__init__(self.message)
+
+class RateLimitError(Exception):
+    def __init__(self, retry_after: float):
+        self.status_code = 429
+        self.retry_after = retry_after
+        self.message = f'Rate limit exceeded. Try again in {retry_after:.2f} seconds.'
+        super().__init__(self.message)
+
+class PayloadTooLargeError(Exception):
+    def __init__(self, max_size: int):
+        self.status_code = 413
+        self.message = f'The request body exceeds the maximum size of {max_size // (1024 * 1024)}MB.'
         super().__init__(self.message)
\ No newline at end of file
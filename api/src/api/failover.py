@@ -0,0 +1,105 @@
+import time
+import random
+import asyncio
+import httpx
+from dataclasses import dataclass
+from fastapi import Request, Response
+from typing import Dict, Any, Optional
+from .exceptions import NoProviderAvailableError
+from ..core import provider_manager, circuit_breakers, metrics
+from ..providers import BaseProvider, ProviderUnavailableError
+
+@dataclass
+class FailoverConfig:
+    max_attempts: int = 3
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    deadline: float = 60.0
+
+class FailoverEngine:
+    def __init__(self, config: Optional[FailoverConfig] = None):
+        self.config = config or FailoverConfig()
+
+    def _get_backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _is_retryable(response: Response) -> bool:
+        return response.status_code >= 500
+
+    @staticmethod
+    def _record_outcome(name: str, success: bool, latency: float) -> None:
+        circuit_breakers.provider(name).record(success, latency)
+
+    async def execute(
+        self,
+        request: Request,
+        method: str,
+        model: str,
+        payload: Dict[str, Any],
+        vision: bool = False,
+        tools: bool = False,
+        max_attempts: Optional[int] = None
+    ) -> Response:
+        selection_start = time.perf_counter()
+        candidates = await provider_manager.get_providers(model, vision, tools)
+        metrics.phase_duration.observe(time.perf_counter() - selection_start, 'provider_selection')
+        loop = asyncio.get_running_loop()
+        # The deadline only gates starting new attempts; a running call is bounded by its provider's own timeout.
+        deadline = loop.time() + self.config.deadline
+        max_attempts = max_attempts or self.config.max_attempts
+        attempts = 0
+        cursor = 0
+        backoff = False
+        response = None
+
+        while candidates and attempts < max_attempts:
+            provider = candidates[cursor % len(candidates)]
+            if not circuit_breakers.provider(provider['name']).allow_request():
+                candidates.remove(provider)
+                continue
+
+            if backoff:
+                delay = self._get_backoff(attempts - 1)
+                if loop.time() + delay >= deadline:
+                    break
+                await asyncio.sleep(delay)
+                backoff = False
+            elif loop.time() >= deadline:
+                break
+
+            request.state.provider = provider
+            request.state.model = model
+            provider_class = BaseProvider.get_provider_class(provider['name'])
+            attempt_start = loop.time()
+
+            try:
+                response = await getattr(provider_class, method)(request, **payload)
+            except ProviderUnavailableError:
+                self._record_outcome(provider['name'], False, loop.time() - attempt_start)
+                candidates.remove(provider)
+                continue
+            except httpx.HTTPError:
+                metrics.upstream_responses.inc(provider['name'], 'error')
+                self._record_outcome(provider['name'], False, loop.time() - attempt_start)
+                attempts += 1
+                cursor += 1
+                backoff = True
+                continue
+
+            attempts += 1
+            success = not self._is_retryable(response)
+            self._record_outcome(provider['name'], success, loop.time() - attempt_start)
+
+            if success:
+                break
+
+            cursor += 1
+            backoff = True
+
+        if response is None:
+            raise NoProviderAvailableError()
+
+        return response
+
+failover_engine = FailoverEngine()
\ No newline at end of file
@@ -0,0 +1,29 @@
+import time
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from ..core import metrics
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            path = getattr(route, 'path', 'unmatched')
+            metrics.requests.inc(path, scope['method'], str(status))
+            metrics.request_duration.observe(time.perf_counter() - start, path)
\ No newline at end of file
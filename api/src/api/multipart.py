@@ -0,0 +1,108 @@
+import re
+from dataclasses import dataclass
+from fastapi import Request
+from typing import Dict, AsyncIterator, Optional
+from .exceptions import ValidationError, PayloadTooLargeError
+
+@dataclass
+class MultipartConfig:
+    max_size: int = 26 * 1024 * 1024
+    peek_window: int = 4096
+
+class MultipartBody:
+    def __init__(self, request: Request, config: Optional[MultipartConfig] = None):
+        self.config = config or MultipartConfig()
+        self.content_type = request.headers.get('content-type', '')
+        self.boundary = self._get_boundary(self.content_type)
+
+        if not self.boundary:
+            raise ValidationError('The request body must be multipart/form-data.')
+
+        content_length = request.headers.get('content-length', '')
+        self.content_length = int(content_length) if content_length.isdigit() else None
+
+        if self.content_length is not None and self.content_length > self.config.max_size:
+            raise PayloadTooLargeError(self.config.max_size)
+
+        self.chunks = request.stream().__aiter__()
+        self.buffer = bytearray()
+        self.fields: Dict[str, str] = {}
+        self.bytes_in = 0
+        self.consumed = False
+
+    @staticmethod
+    def _get_boundary(content_type: str) -> Optional[bytes]:
+        media_type, _, params = content_type.partition(';')
+        if media_type.strip().lower() != 'multipart/form-data':
+            return None
+
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.lower() == 'boundary' and value:
+                return value.strip('"').encode('latin-1')
+
+        return None
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = {'Content-Type': self.content_type}
+        if self.content_length is not None:
+            headers['Content-Length'] = str(self.content_length)
+        return headers
+
+    async def _read_chunk(self) -> Optional[bytes]:
+        try:
+            chunk = await self.chunks.__anext__()
+        except StopAsyncIteration:
+            return None
+
+        self.bytes_in += len(chunk)
+        if self.bytes_in > self.config.max_size:
+            raise PayloadTooLargeError(self.config.max_size)
+
+        return chunk
+
+    async def read_field(self, name: str) -> Optional[str]:
+        if name in self.fields:
+            return self.fields[name]
+
+        pattern = re.compile(
+            rb'--' + re.escape(self.boundary) + rb'\r\n(?:[^\r\n]+\r\n)*?'
+            rb'content-disposition:[ \t]*form-data;[ \t]*name="' + re.escape(name.encode()) + rb'"[^\r\n]*\r\n'
+            rb'(?:[^\r\n]+\r\n)*\r\n',
+            re.IGNORECASE
+        )
+        delimiter = b'\r\n--' + self.boundary
+        scan_from = 0
+
+        while True:
+            match = pattern.search(self.buffer, scan_from)
+
+            if match:
+                end = self.buffer.find(delimiter, match.end())
+                if end != -1:
+                    self.fields[name] = self.buffer[match.end():end].decode('utf-8', 'replace')
+                    return self.fields[name]
+                scan_from = match.start()
+            else:
+                scan_from = max(scan_from, len(self.buffer) - self.config.peek_window)
+
+            chunk = await self._read_chunk()
+            if chunk is None:
+                return None
+
+            self.buffer += chunk
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        if self.consumed:
+            raise RuntimeError('The request body has already been forwarded')
+        self.consumed = True
+
+        buffer, self.buffer = self.buffer, bytearray()
+        if buffer:
+            yield bytes(buffer)
+        del buffer
+
+        while (chunk := await self._read_chunk()) is not None:
+            if chunk:
+                yield chunk
\ No newline at end of file
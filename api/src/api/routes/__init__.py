@@ -1,4 +1,5 @@
 from .home import router as home_router
+from .metrics import router as metrics_router
 from .v1 import (
     models_router,
     chat_router,
@@ -10,6 +11,7 @@ from .v1 import (
 
 __all__ = [
     'home_router',
+    'metrics_router',
     'models_router',
     'chat_router',
     'image_router',
@@ -0,0 +1,13 @@
+import asyncio
+from fastapi import APIRouter, Response, Depends
+from ..dependencies import metrics_authentication
+from ...core import metrics
+
+router = APIRouter()
+
+@router.get('/metrics', include_in_schema=False, dependencies=[Depends(metrics_authentication)])
+async def get_metrics() -> Response:
+    # Collectors and metric dicts are only touched on the event loop; the thread gets a plain snapshot.
+    snapshot = metrics.registry.snapshot()
+    content = await asyncio.to_thread(metrics.registry.render, snapshot)
+    return Response(content, media_type='text/plain; version=0.0.4')
\ No newline at end of file
@@ -1,20 +1,15 @@
-from fastapi import APIRouter, Request, Response, UploadFile, File, Form, HTTPException
-from ...dependencies import DEPENDENCIES
+from fastapi import APIRouter, Request, Response, Depends, HTTPException
+from ...dependencies import DEPENDENCIES, validated_body, validate_multipart_model
 from ....models import SpeechRequest
-from ....core import provider_manager
 from ....providers import BaseProvider
-from ...exceptions import InsufficientCreditsError, NoProviderAvailableError
+from ....core import metrics
+from ...failover import failover_engine
+from ...multipart import MultipartBody
+from ...exceptions import InsufficientCreditsError, NoProviderAvailableError, PayloadTooLargeError
 
 router = APIRouter(prefix='/v1')
 
 class AudioHandler:
-    @staticmethod
-    async def _get_provider(model: str) -> dict:
-        provider = await provider_manager.get_best_provider(model)
-        if not provider:
-            raise NoProviderAvailableError()
-        return provider
-
     @staticmethod
     def _validate_credits(
         available_credits: int,
@@ -27,36 +22,32 @@ class AudioHandler:
             )
 
     @staticmethod
-    def _get_token_count(
-        provider_instance: BaseProvider,
-        model: str
-    ) -> int:
-        return provider_instance.config.model_prices.get(model, 100)
+    def _get_token_count(model: str) -> int:
+        return BaseProvider.get_registry().model_prices.get(model, 100)
+
+    @staticmethod
+    def _record_transfer(body: MultipartBody, response: Response) -> None:
+        metrics.forwarded_bytes.observe(body.bytes_in, 'in')
+        metrics.forwarded_bytes.observe(len(response.body), 'out')
 
 @router.post('/audio/speech', dependencies=DEPENDENCIES, response_model=None)
 async def audio_speech(
     request: Request,
-    data: SpeechRequest
+    data: SpeechRequest = validated_body(SpeechRequest)
 ) -> Response:
     try:
-        provider = await AudioHandler._get_provider(data.model)
-        provider_instance = BaseProvider.get_provider_class(provider['name'])
-        
-        token_count = AudioHandler._get_token_count(
-            provider_instance=provider_instance,
-            model=data.model
-        )
+        token_count = AudioHandler._get_token_count(data.model)
 
         AudioHandler._validate_credits(
             available_credits=request.state.user['credits'],
             required_tokens=token_count
         )
 
-        request.state.provider = provider
-
-        return await provider_instance.audio_speech(
+        return await failover_engine.execute(
             request,
-            **data.model_dump(mode='json')
+            method='audio_speech',
+            model=data.model,
+            payload=data.model_dump(mode='json')
         )
 
     except (InsufficientCreditsError, NoProviderAvailableError) as e:
@@ -73,32 +64,29 @@ async def audio_speech(
 @router.post('/audio/transcriptions', dependencies=DEPENDENCIES, response_model=None)
 async def audio_transcriptions(
     request: Request,
-    model: str = Form(...),
-    file: UploadFile = File(...)
+    body: MultipartBody = Depends(validate_multipart_model)
 ) -> Response:
     try:
-        provider = await AudioHandler._get_provider(model)
-        provider_instance = BaseProvider.get_provider_class(provider['name'])
-        
-        token_count = AudioHandler._get_token_count(
-            provider_instance=provider_instance,
-            model=model
-        )
+        model = body.fields['model']
+        token_count = AudioHandler._get_token_count(model)
 
         AudioHandler._validate_credits(
             available_credits=request.state.user['credits'],
             required_tokens=token_count
         )
 
-        request.state.provider = provider
-
-        return await provider_instance.audio_transcriptions(
+        response = await failover_engine.execute(
             request,
-            model,
-            file
+            method='audio_transcriptions',
+            model=model,
+            payload={'model': model, 'content': body.stream(), 'headers': body.headers},
+            # The body can only be forwarded once; skipped providers (open breaker, no keys) don't use the attempt.
+            max_attempts=1
         )
+        AudioHandler._record_transfer(body, response)
+        return response
 
-    except (InsufficientCreditsError, NoProviderAvailableError) as e:
+    except (InsufficientCreditsError, NoProviderAvailableError, PayloadTooLargeError) as e:
         raise HTTPException(
             status_code=e.status_code,
             detail=str(e)
@@ -112,32 +100,29 @@ async def audio_transcriptions(
 @router.post('/audio/translations', dependencies=DEPENDENCIES, response_model=None)
 async def audio_translations(
     request: Request,
-    model: str = Form(...),
-    file: UploadFile = File(...)
+    body: MultipartBody = Depends(validate_multipart_model)
 ) -> Response:
     try:
-        provider = await AudioHandler._get_provider(model)
-        provider_instance = BaseProvider.get_provider_class(provider['name'])
-        
-        token_count = AudioHandler._get_token_count(
-            provider_instance=provider_instance,
-            model=model
-        )
+        model = body.fields['model']
+        token_count = AudioHandler._get_token_count(model)
 
         AudioHandler._validate_credits(
             available_credits=request.state.user['credits'],
             required_tokens=token_count
         )
 
-        request.state.provider = provider
-
-        return await provider_instance.audio_translations(
+        response = await failover_engine.execute(
             request,
-            model,
-            file
+            method='audio_translations',
+            model=model,
+            payload={'model': model, 'content': body.stream(), 'headers': body.headers},
+            # The body can only be forwarded once; skipped providers (open breaker, no keys) don't use the attempt.
+            max_attempts=1
         )
+        AudioHandler._record_transfer(body, response)
+        return response
 
-    except (InsufficientCreditsError, NoProviderAvailableError) as e:
+    except (InsufficientCreditsError, NoProviderAvailableError, PayloadTooLargeError) as e:
         raise HTTPException(
             status_code=e.status_code,
             detail=str(e)
@@ -2,11 +2,10 @@ from fastapi import APIRouter, Request, HTTPException
 from fastapi.responses import StreamingResponse
 from typing import Union, List
 from ....responses import JSONResponse
-from ...dependencies import DEPENDENCIES
+from ...dependencies import DEPENDENCIES, validated_body
 from ....models import ChatRequest, Message
 from ....utils import request_processor
-from ....core import provider_manager
-from ....providers import BaseProvider
+from ...failover import failover_engine
 from ...exceptions import InsufficientCreditsError, NoProviderAvailableError
 
 router = APIRouter(prefix='/v1')
@@ -28,30 +27,13 @@ class ChatCompletionsHandler:
                 required_tokens=required_tokens
             )
 
-    @staticmethod
-    async def _get_provider(
-        model: str,
-        vision_required: bool,
-        tools_required: bool
-    ) -> dict:
-        provider = await provider_manager.get_best_provider(
-            model=model,
-            vision=vision_required,
-            tools=tools_required
-        )
-        
-        if not provider:
-            raise NoProviderAvailableError()
-            
-        return provider
-
 @router.post('/chat/completions', dependencies=DEPENDENCIES, response_model=None)
 async def chat_completions(
     request: Request,
-    data: ChatRequest
+    data: ChatRequest = validated_body(ChatRequest)
 ) -> Union[JSONResponse, StreamingResponse]:
     try:
-        token_count = request_processor.count_tokens(data)
+        token_count = await request_processor.count_tokens_async(data)
         
         ChatCompletionsHandler._validate_credits(
             available_credits=request.state.user['credits'],
@@ -60,20 +42,13 @@ async def chat_completions(
 
         request.state.token_count = token_count
 
-        vision_required = ChatCompletionsHandler._has_vision_requirement(data.messages)
-        
-        provider = await ChatCompletionsHandler._get_provider(
-            model=data.model,
-            vision_required=vision_required,
-            tools_required=data.tool_choice and data.tools
-        )
-        
-        request.state.provider = provider
-        
-        provider_instance = BaseProvider.get_provider_class(provider['name'])
-        return await provider_instance.chat_completions(
+        return await failover_engine.execute(
             request,
-            **data.model_dump(mode='json')
+            method='chat_completions',
+            model=data.model,
+            payload=data.model_dump(mode='json'),
+            vision=ChatCompletionsHandler._has_vision_requirement(data.messages),
+            tools=bool(data.tool_choice and data.tools)
         )
         
     except (InsufficientCreditsError, NoProviderAvailableError) as e:
@@ -1,21 +1,14 @@
 from fastapi import APIRouter, Request, HTTPException
 from ....responses import JSONResponse
-from ...dependencies import DEPENDENCIES
+from ...dependencies import DEPENDENCIES, validated_body
 from ....models import EmbeddingsRequest
-from ....core import provider_manager
 from ....providers import BaseProvider
+from ...failover import failover_engine
 from ...exceptions import InsufficientCreditsError, NoProviderAvailableError
 
 router = APIRouter(prefix='/v1')
 
 class EmbeddingsHandler:
-    @staticmethod
-    async def _get_provider(model: str) -> dict:
-        provider = await provider_manager.get_best_provider(model)
-        if not provider:
-            raise NoProviderAvailableError()
-        return provider
-
     @staticmethod
     def _validate_credits(
         available_credits: int,
@@ -28,36 +21,27 @@ class EmbeddingsHandler:
             )
 
     @staticmethod
-    def _get_token_count(
-        provider_instance: BaseProvider,
-        model: str
-    ) -> int:
-        return provider_instance.config.model_prices.get(model, 100)
+    def _get_token_count(model: str) -> int:
+        return BaseProvider.get_registry().model_prices.get(model, 100)
 
 @router.post('/embeddings', dependencies=DEPENDENCIES, response_model=None)
 async def embeddings(
     request: Request,
-    data: EmbeddingsRequest
+    data: EmbeddingsRequest = validated_body(EmbeddingsRequest)
 ) -> JSONResponse:
     try:
-        provider = await EmbeddingsHandler._get_provider(data.model)
-        provider_instance = BaseProvider.get_provider_class(provider['name'])
-        
-        token_count = EmbeddingsHandler._get_token_count(
-            provider_instance=provider_instance,
-            model=data.model
-        )
+        token_count = EmbeddingsHandler._get_token_count(data.model)
 
         EmbeddingsHandler._validate_credits(
             available_credits=request.state.user['credits'],
             required_tokens=token_count
         )
 
-        request.state.provider = provider
-
-        return await provider_instance.embeddings(
+        return await failover_engine.execute(
             request,
-            **data.model_dump(mode='json')
+            method='embeddings',
+            model=data.model,
+            payload=data.model_dump(mode='json')
         )
 
     except (InsufficientCreditsError, NoProviderAvailableError) as e:
@@ -1,21 +1,14 @@
 from fastapi import APIRouter, Request, HTTPException
 from ....responses import JSONResponse
-from ...dependencies import DEPENDENCIES
+from ...dependencies import DEPENDENCIES, validated_body
 from ....models import ImageRequest
-from ....core import provider_manager
 from ....providers import BaseProvider
+from ...failover import failover_engine
 from ...exceptions import InsufficientCreditsError, NoProviderAvailableError
 
 router = APIRouter(prefix='/v1')
 
 class ImageGenerationHandler:
-    @staticmethod
-    async def _get_provider(model: str) -> dict:
-        provider = await provider_manager.get_best_provider(model)
-        if not provider:
-            raise NoProviderAvailableError()
-        return provider
-
     @staticmethod
     def _validate_credits(
         available_credits: int,
@@ -28,36 +21,27 @@ class ImageGenerationHandler:
             )
 
     @staticmethod
-    def _get_token_count(
-        provider_instance: BaseProvider,
-        model: str
-    ) -> int:
-        return provider_instance.config.model_prices.get(model, 100)
+    def _get_token_count(model: str) -> int:
+        return BaseProvider.get_registry().model_prices.get(model, 100)
 
 @router.post('/images/generations', dependencies=DEPENDENCIES, response_model=None)
 async def images_generations(
     request: Request,
-    data: ImageRequest
+    data: ImageRequest = validated_body(ImageRequest)
 ) -> JSONResponse:
     try:
-        provider = await ImageGenerationHandler._get_provider(data.model)
-        provider_instance = BaseProvider.get_provider_class(provider['name'])
-        
-        token_count = ImageGenerationHandler._get_token_count(
-            provider_instance=provider_instance,
-            model=data.model
-        )
+        token_count = ImageGenerationHandler._get_token_count(data.model)
 
         ImageGenerationHandler._validate_credits(
             available_credits=request.state.user['credits'],
             required_tokens=token_count
         )
 
-        request.state.provider = provider
-
-        return await provider_instance.images_generations(
+        return await failover_engine.execute(
             request,
-            **data.model_dump(mode='json')
+            method='images_generations',
+            model=data.model,
+            payload=data.model_dump(mode='json')
         )
 
     except (InsufficientCreditsError, NoProviderAvailableError) as e:
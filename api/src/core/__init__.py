@@ -1,8 +1,28 @@
-from .db import user_manager, provider_manager
+from .db import database, index_manager, user_manager, provider_manager, sub_provider_manager
 from .config import settings
+from .http_client import http_client_manager, HTTPClientConfig
+from .rate_limiter import rate_limiter, RateLimit
+from .circuit_breaker import circuit_breakers
+from .latency import latency_tracker
+from .metrics import metrics
+from .cache import embeddings_cache, moderations_cache
+from .batcher import embeddings_batcher
 
 __all__ = [
+    'database',
+    'index_manager',
     'user_manager',
     'provider_manager',
-    'settings'
+    'sub_provider_manager',
+    'settings',
+    'http_client_manager',
+    'HTTPClientConfig',
+    'rate_limiter',
+    'RateLimit',
+    'circuit_breakers',
+    'latency_tracker',
+    'metrics',
+    'embeddings_cache',
+    'moderations_cache',
+    'embeddings_batcher'
 ]
\ No newline at end of file
@@ -0,0 +1,88 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Tuple, Hashable, Callable, Awaitable, Optional
+from .config import settings
+from .metrics import metrics
+
+BatchSender = Callable[[List[Any], List[Any]], Awaitable[Optional[List[Any]]]]
+
+@dataclass
+class EmbeddingsBatcherConfig:
+    enabled: bool = settings.embeddings_batching
+    max_wait: float = settings.embeddings_batch_wait
+    max_items: int = settings.embeddings_batch_max_items
+
+@dataclass
+class EmbeddingsBatch:
+    send: BatchSender
+    items: List[Any] = field(default_factory=list)
+    waiters: List[Tuple[int, int, asyncio.Future]] = field(default_factory=list)
+    contexts: List[Any] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+class EmbeddingsBatcher:
+    def __init__(self, config: Optional[EmbeddingsBatcherConfig] = None):
+        self.config = config or EmbeddingsBatcherConfig()
+        self.batches: Dict[Hashable, EmbeddingsBatch] = {}
+        self.tasks: set = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.config.enabled
+
+    def _dispatch(self, key: Hashable, batch: EmbeddingsBatch) -> None:
+        if self.batches.get(key) is batch:
+            del self.batches[key]
+
+        if batch.timer is not None:
+            batch.timer.cancel()
+
+        task = asyncio.create_task(self._flush(batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _flush(self, batch: EmbeddingsBatch) -> None:
+        metrics.embeddings_batch_items.observe(len(batch.items))
+
+        try:
+            results = await batch.send(batch.items, batch.contexts)
+        except Exception as e:
+            for _, _, future in batch.waiters:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for start, count, future in batch.waiters:
+            if not future.done():
+                future.set_result(results[start:start + count] if results is not None else None)
+
+    async def submit(
+        self,
+        key: Hashable,
+        items: List[Any],
+        send: BatchSender,
+        context: Any = None
+    ) -> Optional[List[Any]]:
+        batch = self.batches.get(key)
+
+        if batch is not None and len(batch.items) + len(items) > self.config.max_items:
+            self._dispatch(key, batch)
+            batch = None
+
+        if batch is None:
+            batch = self.batches[key] = EmbeddingsBatch(send)
+            batch.timer = asyncio.get_running_loop().call_later(
+                self.config.max_wait, self._dispatch, key, batch
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        batch.waiters.append((len(batch.items), len(items), future))
+        batch.contexts.append(context)
+        batch.items.extend(items)
+
+        if len(batch.items) >= self.config.max_items:
+            self._dispatch(key, batch)
+
+        return await future
+
+embeddings_batcher = EmbeddingsBatcher()
\ No newline at end of file
@@ -0,0 +1,13 @@
+from .tiered import TieredCache, TieredCacheConfig
+from .items import ItemCache, CacheLookup
+from .embeddings import embeddings_cache
+from .moderations import moderations_cache
+
+__all__ = [
+    'TieredCache',
+    'TieredCacheConfig',
+    'ItemCache',
+    'CacheLookup',
+    'embeddings_cache',
+    'moderations_cache'
+]
\ No newline at end of file
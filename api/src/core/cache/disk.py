@@ -0,0 +1,100 @@
+import os
+import mmap
+import zlib
+import struct
+from typing import Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+class DiskCache:
+    HEAD = struct.Struct('<Q')
+    SLOT = struct.Struct('<16sQI')
+    RECORD = struct.Struct('<16sII')
+    HEADER_SIZE = 64
+
+    def __init__(self, path: str, max_bytes: int, buckets: int, ways: int):
+        self.buckets = buckets
+        self.ways = ways
+        self.bucket_size = self.SLOT.size * ways
+        self.data_offset = self.HEADER_SIZE + self.bucket_size * buckets
+        self.data_size = max_bytes
+        self.max_value_size = max_bytes // 8
+        size = self.data_offset + max_bytes
+
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.memory = mmap.mmap(self.fd, size)
+
+    def _bucket_offset(self, key: bytes) -> int:
+        return self.HEADER_SIZE + int.from_bytes(key[:8], 'little') % self.buckets * self.bucket_size
+
+    def _read_record(self, key: bytes, offset: int, length: int) -> Optional[bytes]:
+        if offset + self.RECORD.size + length > self.data_size:
+            return None
+
+        position = self.data_offset + offset
+        record_key, record_length, checksum = self.RECORD.unpack_from(self.memory, position)
+        if record_key != key or record_length != length:
+            return None
+
+        start = position + self.RECORD.size
+        value = self.memory[start:start + length]
+        return value if zlib.crc32(value) == checksum else None
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        bucket_offset = self._bucket_offset(key)
+
+        for way in range(self.ways):
+            slot_key, offset, length = self.SLOT.unpack_from(self.memory, bucket_offset + way * self.SLOT.size)
+            if slot_key == key:
+                return self._read_record(key, offset, length)
+
+        return None
+
+    def _find_slot(self, bucket_offset: int, key: bytes, head: int) -> int:
+        victim, victim_age = bucket_offset, -1
+
+        for way in range(self.ways):
+            slot_offset = bucket_offset + way * self.SLOT.size
+            slot_key, offset, _ = self.SLOT.unpack_from(self.memory, slot_offset)
+
+            if slot_key == key:
+                return slot_offset
+
+            age = (head - offset) % self.data_size if slot_key.strip(b'\0') else self.data_size
+            if age > victim_age:
+                victim, victim_age = slot_offset, age
+
+        return victim
+
+    def _allocate(self, size: int) -> Tuple[int, int]:
+        (head,) = self.HEAD.unpack_from(self.memory, 0)
+        if head + size > self.data_size:
+            head = 0
+        return head, head + size
+
+    def set(self, key: bytes, value: bytes) -> None:
+        if len(value) > self.max_value_size:
+            return
+
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, self.HEADER_SIZE, 0)
+        try:
+            offset, head = self._allocate(self.RECORD.size + len(value))
+            position = self.data_offset + offset
+
+            self.RECORD.pack_into(self.memory, position, key, len(value), zlib.crc32(value))
+            self.memory[position + self.RECORD.size:position + self.RECORD.size + len(value)] = value
+
+            slot_offset = self._find_slot(self._bucket_offset(key), key, head)
+            self.SLOT.pack_into(self.memory, slot_offset, key, offset, len(value))
+            self.HEAD.pack_into(self.memory, 0, head)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.HEADER_SIZE, 0)
+
+    def close(self) -> None:
+        self.memory.close()
+        os.close(self.fd)
\ No newline at end of file
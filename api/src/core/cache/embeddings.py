@@ -0,0 +1,49 @@
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional
+from .tiered import TieredCache, TieredCacheConfig
+from .items import ItemCache, CacheLookup
+from ..config import settings
+
+@dataclass
+class EmbeddingsCacheConfig:
+    memory_bytes: int = settings.embeddings_cache_memory_size
+    disk_path: str = settings.embeddings_cache_file or os.path.join(tempfile.gettempdir(), 'api-embeddings-cache')
+    disk_bytes: int = settings.embeddings_cache_disk_size
+
+class EmbeddingsCache(ItemCache):
+    def __init__(self, config: Optional[EmbeddingsCacheConfig] = None):
+        self.config = config or EmbeddingsCacheConfig()
+        super().__init__(TieredCache(TieredCacheConfig(
+            name='embeddings',
+            memory_bytes=self.config.memory_bytes,
+            disk_path=self.config.disk_path,
+            disk_bytes=self.config.disk_bytes
+        )))
+
+    @staticmethod
+    def split_input(input: Any) -> List[Any]:
+        if isinstance(input, str):
+            return [input]
+
+        items = list(input)
+        if all(isinstance(item, int) for item in items):
+            return [items]
+
+        return [item if isinstance(item, str) else list(item) for item in items]
+
+    @staticmethod
+    def build_response(lookup: CacheLookup, usage: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        tokens = sum(result['tokens'] for result in lookup.results)
+        return {
+            'object': 'list',
+            'data': [
+                {'object': 'embedding', 'index': index, 'embedding': result['embedding']}
+                for index, result in enumerate(lookup.results)
+            ],
+            'model': lookup.model,
+            'usage': usage or {'prompt_tokens': tokens, 'total_tokens': tokens}
+        }
+
+embeddings_cache = EmbeddingsCache()
\ No newline at end of file
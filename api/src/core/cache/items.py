@@ -0,0 +1,45 @@
+import ujson
+import hashlib
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional
+from .tiered import TieredCache
+
+@dataclass
+class CacheLookup:
+    model: str
+    items: List[Any]
+    keys: List[bytes]
+    results: List[Optional[Dict[str, Any]]] = field(default_factory=list)
+
+    @property
+    def misses(self) -> List[int]:
+        return [index for index, result in enumerate(self.results) if result is None]
+
+class ItemCache:
+    def __init__(self, cache: TieredCache):
+        self.cache = cache
+
+    @staticmethod
+    def _get_key(prefix: bytes, item: Any) -> bytes:
+        data = b's' + item.encode() if isinstance(item, str) else b't' + ujson.dumps(item).encode()
+        return hashlib.blake2b(prefix + data, digest_size=16).digest()
+
+    def lookup(self, model: str, items: List[Any], params: Dict[str, Any]) -> CacheLookup:
+        prefix = f'{model}\0{ujson.dumps(params, sort_keys=True)}\0'.encode()
+        lookup = CacheLookup(model, items, [self._get_key(prefix, item) for item in items])
+
+        for key in lookup.keys:
+            value = self.cache.get(key)
+            lookup.results.append(ujson.loads(value) if value is not None else None)
+
+        return lookup
+
+    def store(self, lookup: CacheLookup, index: int, result: Dict[str, Any]) -> None:
+        lookup.results[index] = result
+        self.cache.set(lookup.keys[index], ujson.dumps(result).encode())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats()
+
+    def close(self) -> None:
+        self.cache.close()
\ No newline at end of file
@@ -0,0 +1,32 @@
+import uuid
+from dataclasses import dataclass
+from typing import List, Dict, Any, Union, Optional
+from .tiered import TieredCache, TieredCacheConfig
+from .items import ItemCache, CacheLookup
+from ..config import settings
+
+@dataclass
+class ModerationsCacheConfig:
+    memory_bytes: int = settings.moderations_cache_memory_size
+
+class ModerationsCache(ItemCache):
+    def __init__(self, config: Optional[ModerationsCacheConfig] = None):
+        self.config = config or ModerationsCacheConfig()
+        super().__init__(TieredCache(TieredCacheConfig(
+            name='moderations',
+            memory_bytes=self.config.memory_bytes
+        )))
+
+    @staticmethod
+    def split_input(input: Union[str, List[str]]) -> List[str]:
+        return [input] if isinstance(input, str) else list(input)
+
+    @staticmethod
+    def build_response(lookup: CacheLookup, response_id: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            'id': response_id or f'modr-{uuid.uuid4().hex}',
+            'model': lookup.model,
+            'results': lookup.results
+        }
+
+moderations_cache = ModerationsCache()
\ No newline at end of file
@@ -0,0 +1,85 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from .memory import MemoryCache
+from .disk import DiskCache, fcntl
+from ..metrics import metrics
+
+@dataclass
+class TieredCacheConfig:
+    name: str
+    memory_bytes: int = 64 * 1024 * 1024
+    disk_path: str = ''
+    disk_bytes: int = 0
+    disk_buckets: int = 8192
+    disk_ways: int = 8
+
+class TieredCache:
+    def __init__(self, config: TieredCacheConfig):
+        self.config = config
+        self.memory = MemoryCache(config.memory_bytes)
+        self.disk: Optional[DiskCache] = None
+        self.disk_failed = False
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'bytes_saved': 0}
+
+    def _get_disk(self) -> Optional[DiskCache]:
+        if self.disk is None and not self.disk_failed:
+            if not self.config.disk_path or not self.config.disk_bytes or fcntl is None:
+                self.disk_failed = True
+                return None
+
+            try:
+                self.disk = DiskCache(
+                    self.config.disk_path,
+                    self.config.disk_bytes,
+                    self.config.disk_buckets,
+                    self.config.disk_ways
+                )
+            except OSError as e:
+                print(f'Failed to open {self.config.name} disk cache: {str(e)}')
+                self.disk_failed = True
+
+        return self.disk
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        tier = 'memory'
+        value = self.memory.get(key)
+
+        if value is None and (disk := self._get_disk()) is not None:
+            tier = 'disk'
+            value = disk.get(key)
+            if value is not None:
+                self.memory.set(key, value)
+
+        if value is None:
+            self.stats['misses'] += 1
+            metrics.cache_lookups.inc(self.config.name, 'miss')
+            return None
+
+        self.stats[f'{tier}_hits'] += 1
+        self.stats['bytes_saved'] += len(value)
+        metrics.cache_lookups.inc(self.config.name, tier)
+        metrics.cache_bytes_saved.inc(self.config.name, value=len(value))
+        return value
+
+    def set(self, key: bytes, value: bytes) -> None:
+        self.memory.set(key, value)
+
+        if (disk := self._get_disk()) is not None:
+            disk.set(key, value)
+
+    def close(self) -> None:
+        self.memory.clear()
+
+        if self.disk is not None:
+            self.disk.close()
+            self.disk = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats['memory_hits'] + self.stats['disk_hits'] + self.stats['misses']
+        hits = lookups - self.stats['misses']
+
+        return {
+            **self.stats,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'memory_size': self.memory.size
+        }
\ No newline at end of file
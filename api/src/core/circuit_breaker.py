@@ -0,0 +1,145 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+@dataclass
+class CircuitBreakerConfig:
+    window: float = 30.0
+    buckets: int = 10
+    min_requests: int = 10
+    error_rate_threshold: float = 0.5
+    slow_call_threshold: float = 30.0
+    slow_rate_threshold: float = 0.8
+    open_duration: float = 30.0
+
+class RollingWindow:
+    def __init__(self, config: CircuitBreakerConfig):
+        self.config = config
+        self.width = config.window / config.buckets
+        self.buckets: List[List[int]] = [[-1, 0, 0, 0] for _ in range(config.buckets)]
+
+    def add(self, success: bool, slow: bool, now: float) -> None:
+        bucket_id = int(now / self.width)
+        bucket = self.buckets[bucket_id % self.config.buckets]
+
+        if bucket[0] != bucket_id:
+            bucket[:] = [bucket_id, 0, 0, 0]
+
+        bucket[1] += 1
+        bucket[2] += not success
+        bucket[3] += slow
+
+    def totals(self, now: float) -> List[int]:
+        oldest = int(now / self.width) - self.config.buckets
+        totals = [0, 0, 0]
+
+        for bucket_id, total, errors, slow in self.buckets:
+            if bucket_id > oldest:
+                totals[0] += total
+                totals[1] += errors
+                totals[2] += slow
+
+        return totals
+
+    def reset(self) -> None:
+        for bucket in self.buckets:
+            bucket[:] = [-1, 0, 0, 0]
+
+class CircuitBreaker:
+    def __init__(self, config: CircuitBreakerConfig):
+        self.config = config
+        self.window = RollingWindow(config)
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self.trial_at = 0.0
+
+    def is_available(self) -> bool:
+        if self.state == CLOSED:
+            return True
+
+        started = self.opened_at if self.state == OPEN else self.trial_at
+        return time.time() >= started + self.config.open_duration
+
+    def allow_request(self) -> bool:
+        if not self.is_available():
+            return False
+
+        if self.state != CLOSED:
+            self.state = HALF_OPEN
+            self.trial_at = time.time()
+
+        return True
+
+    def _open(self, now: float) -> None:
+        self.state = OPEN
+        self.opened_at = now
+
+    def _should_open(self, now: float) -> bool:
+        total, errors, slow = self.window.totals(now)
+
+        if total < self.config.min_requests:
+            return False
+
+        return (
+            errors / total >= self.config.error_rate_threshold or
+            slow / total >= self.config.slow_rate_threshold
+        )
+
+    def record(self, success: bool, latency: float) -> None:
+        now = time.time()
+        slow = latency >= self.config.slow_call_threshold
+
+        if self.state == HALF_OPEN:
+            if success and not slow:
+                self.state = CLOSED
+                self.window.reset()
+            else:
+                self._open(now)
+            return
+
+        if self.state == OPEN:
+            return
+
+        self.window.add(success, slow, now)
+        if self._should_open(now):
+            self._open(now)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total, errors, slow = self.window.totals(time.time())
+        return {
+            'state': self.state,
+            'requests': total,
+            'errors': errors,
+            'slow': slow
+        }
+
+class CircuitBreakerRegistry:
+    def __init__(self, config: Optional[CircuitBreakerConfig] = None):
+        self.config = config or CircuitBreakerConfig()
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self.breakers.get(name)
+
+        if breaker is None:
+            breaker = self.breakers[name] = CircuitBreaker(self.config)
+
+        return breaker
+
+    def provider(self, name: str) -> CircuitBreaker:
+        return self.get(f'provider:{name}')
+
+    def key(self, api_key: str) -> CircuitBreaker:
+        return self.get(f'key:{api_key}')
+
+    def remove(self, name: str) -> None:
+        self.breakers.pop(name, None)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: breaker.get_stats() for name, breaker in self.breakers.items()}
+
+circuit_breakers = CircuitBreakerRegistry()
\ No newline at end of file
@@ -3,6 +3,28 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class Settings(BaseSettings):
     db_url: str
     webhook_url: str
+    db_name: str = 'db'
+    db_max_pool_size: int = 100
+    db_min_pool_size: int = 0
+    db_max_idle_time_ms: int = 60000
+    db_connect_timeout_ms: int = 5000
+    db_server_selection_timeout_ms: int = 5000
+    db_wait_queue_timeout_ms: int = 2000
+    db_secondary_read_preference: str = 'secondaryPreferred'
+    user_cache_ttl: float = 30
+    user_cache_max_size: int = 10000
+    user_cache_negative_ttl: float = 10
+    rate_limit_backend: str = 'shared'
+    rate_limit_file: str = ''
+    metrics_dir: str = ''
+    metrics_token: str = ''
+    embeddings_cache_file: str = ''
+    embeddings_cache_memory_size: int = 64 * 1024 * 1024
+    embeddings_cache_disk_size: int = 512 * 1024 * 1024
+    embeddings_batching: bool = False
+    moderations_cache_memory_size: int = 16 * 1024 * 1024
+    embeddings_batch_wait: float = 0.005
+    embeddings_batch_max_items: int = 256
 
     model_config = SettingsConfigDict(
         env_file='.env',
@@ -1,3 +1,5 @@
-from .managers import user_manager, provider_manager
+from .client import database
+from .indexes import index_manager
+from .managers import user_manager, provider_manager, sub_provider_manager
 
-__all__ = ['user_manager', 'provider_manager']
\ No newline at end of file
+__all__ = ['database', 'index_manager', 'user_manager', 'provider_manager', 'sub_provider_manager']
\ No newline at end of file
@@ -0,0 +1,138 @@
+import threading
+from dataclasses import dataclass
+from pymongo import monitoring
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from typing import Dict, Any, Optional, Tuple
+from ..config import settings
+
+@dataclass
+class DatabaseConfig:
+    url: str = settings.db_url
+    name: str = settings.db_name
+    max_pool_size: int = settings.db_max_pool_size
+    min_pool_size: int = settings.db_min_pool_size
+    max_idle_time_ms: int = settings.db_max_idle_time_ms
+    connect_timeout_ms: int = settings.db_connect_timeout_ms
+    server_selection_timeout_ms: int = settings.db_server_selection_timeout_ms
+    wait_queue_timeout_ms: int = settings.db_wait_queue_timeout_ms
+    secondary_read_preference: str = settings.db_secondary_read_preference
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def connection_created(self, _: monitoring.ConnectionCreatedEvent) -> None:
+        with self.lock:
+            self.connections += 1
+
+    def connection_closed(self, _: monitoring.ConnectionClosedEvent) -> None:
+        with self.lock:
+            self.connections -= 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self.lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.wait_time_total += event.duration
+            self.wait_time_max = max(self.wait_time_max, event.duration)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self.lock:
+            self.checkout_failures += 1
+            self.wait_time_total += event.duration
+
+    def connection_checked_in(self, _: monitoring.ConnectionCheckedInEvent) -> None:
+        with self.lock:
+            self.checked_out -= 1
+
+    def pool_created(self, _: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, _: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, _: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, _: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_ready(self, _: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_check_out_started(self, _: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'connections': self.connections,
+                'checked_out': self.checked_out,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'wait_time_avg': self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+                'wait_time_max': self.wait_time_max
+            }
+
+class DatabaseClient:
+    def __init__(self, config: Optional[DatabaseConfig] = None):
+        self.config = config or DatabaseConfig()
+        self.pool_metrics = PoolMetrics()
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.collections: Dict[Tuple[str, bool], AsyncIOMotorCollection] = {}
+
+    def connect(self) -> AsyncIOMotorClient:
+        if self.client is None:
+            self.client = AsyncIOMotorClient(
+                self.config.url,
+                maxPoolSize=self.config.max_pool_size,
+                minPoolSize=self.config.min_pool_size,
+                maxIdleTimeMS=self.config.max_idle_time_ms,
+                connectTimeoutMS=self.config.connect_timeout_ms,
+                serverSelectionTimeoutMS=self.config.server_selection_timeout_ms,
+                waitQueueTimeoutMS=self.config.wait_queue_timeout_ms,
+                event_listeners=[self.pool_metrics]
+            )
+        return self.client
+
+    def get_collection(
+        self,
+        name: str,
+        secondary_reads: bool = False
+    ) -> AsyncIOMotorCollection:
+        collection = self.collections.get((name, secondary_reads))
+
+        if collection is None:
+            database = self.connect()[self.config.name]
+            collection = (
+                database.get_collection(
+                    name,
+                    read_preference=make_read_preference(
+                        read_pref_mode_from_name(self.config.secondary_read_preference),
+                        None
+                    )
+                )
+                if secondary_reads
+                else database[name]
+            )
+            self.collections[(name, secondary_reads)] = collection
+
+        return collection
+
+    def close(self) -> None:
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            self.collections.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.pool_metrics.get_stats()
+
+database = DatabaseClient()
\ No newline at end of file
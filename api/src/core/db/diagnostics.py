@@ -0,0 +1,82 @@
+import sys
+import time
+import asyncio
+from dataclasses import dataclass
+from typing import Dict, Any, List, Tuple
+from .client import database
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    collection: str
+    filter: Dict[str, Any]
+
+HOT_QUERIES: Tuple[HotQuery, ...] = (
+    HotQuery('user by key', 'users', {'key': ''}),
+    HotQuery('user by id', 'users', {'user_id': 0}),
+    HotQuery(
+        'users needing refill',
+        'users',
+        {'premium_tier': 0, 'credits': {'$lt': 5000}, 'last_daily': {'$lte': time.time() - 86400}}
+    ),
+    HotQuery('provider by name', 'providers', {'name': ''}),
+    HotQuery('providers by model', 'providers', {'models': ''}),
+    HotQuery('sub-provider by key', 'sub_providers', {'api_key': ''}),
+    HotQuery(
+        'sub-providers by model',
+        'sub_providers',
+        {'main_provider': '', 'models.api_name': {'$in': ['']}}
+    )
+)
+
+class QueryDiagnostics:
+    @staticmethod
+    def _find_stages(plan: Any) -> List[str]:
+        if isinstance(plan, list):
+            return [stage for item in plan for stage in QueryDiagnostics._find_stages(item)]
+
+        if not isinstance(plan, dict):
+            return []
+
+        stages = [plan['stage']] if isinstance(plan.get('stage'), str) else []
+        return stages + [
+            stage for value in plan.values()
+            for stage in QueryDiagnostics._find_stages(value)
+        ]
+
+    @staticmethod
+    async def explain(query: HotQuery) -> List[str]:
+        explanation = await database.get_collection(query.collection).find(query.filter).explain()
+        return QueryDiagnostics._find_stages(explanation['queryPlanner']['winningPlan'])
+
+    @staticmethod
+    async def run(queries: Tuple[HotQuery, ...] = HOT_QUERIES) -> List[str]:
+        failures = []
+
+        for query in queries:
+            stages = await QueryDiagnostics.explain(query)
+            status = 'COLLSCAN' if 'COLLSCAN' in stages else 'ok'
+            print(f'[{status}] {query.collection}: {query.name} ({" <- ".join(stages)})')
+
+            if status != 'ok':
+                failures.append(query.name)
+
+        return failures
+
+async def main() -> int:
+    database.connect()
+
+    try:
+        failures = await QueryDiagnostics.run()
+    finally:
+        database.close()
+
+    if failures:
+        print(f'Collection scans detected in {len(failures)} hot queries: {", ".join(failures)}')
+        return 1
+
+    print('All hot queries are served by an index.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
\ No newline at end of file
@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from pymongo import IndexModel, ASCENDING
+from typing import Dict, Any, List, Tuple, Optional
+from .client import database
+from .exceptions import DatabaseError
+
+@dataclass(frozen=True)
+class IndexSpec:
+    collection: str
+    keys: Tuple[Tuple[str, int], ...]
+    name: str
+    expire_after: Optional[int] = None
+
+    def to_model(self) -> IndexModel:
+        options = {} if self.expire_after is None else {'expireAfterSeconds': self.expire_after}
+        return IndexModel(list(self.keys), name=self.name, **options)
+
+INDEXES: Tuple[IndexSpec, ...] = (
+    IndexSpec('users', (('key', ASCENDING),), 'key_1'),
+    IndexSpec('users', (('user_id', ASCENDING),), 'user_id_1'),
+    IndexSpec('users', (('credits', ASCENDING), ('last_daily', ASCENDING)), 'credits_1_last_daily_1'),
+    IndexSpec('providers', (('name', ASCENDING),), 'name_1'),
+    IndexSpec('providers', (('models', ASCENDING),), 'models_1'),
+    IndexSpec('sub_providers', (('api_key', ASCENDING),), 'api_key_1'),
+    IndexSpec(
+        'sub_providers',
+        (('main_provider', ASCENDING), ('models.api_name', ASCENDING)),
+        'main_provider_1_models.api_name_1'
+    ),
+    IndexSpec('latency_stats', (('window', ASCENDING),), 'window_1'),
+    IndexSpec('latency_stats', (('expires_at', ASCENDING),), 'expires_at_1', expire_after=0),
+    IndexSpec('rate_limits', (('expires_at', ASCENDING),), 'expires_at_1', expire_after=0)
+)
+
+class IndexManager:
+    def __init__(self, specs: Tuple[IndexSpec, ...] = INDEXES):
+        self.specs = specs
+
+    def _group_by_collection(self) -> Dict[str, List[IndexSpec]]:
+        groups: Dict[str, List[IndexSpec]] = {}
+        for spec in self.specs:
+            groups.setdefault(spec.collection, []).append(spec)
+        return groups
+
+    @staticmethod
+    def _existing_keys(index_information: Dict[str, Any]) -> List[Tuple[Tuple[str, int], ...]]:
+        return [
+            tuple((field, direction) for field, direction in info['key'])
+            for info in index_information.values()
+        ]
+
+    async def ensure_indexes(self) -> List[str]:
+        created = []
+
+        try:
+            for name, specs in self._group_by_collection().items():
+                collection = database.get_collection(name)
+                existing = await collection.index_information()
+                existing_keys = self._existing_keys(existing)
+
+                missing = [
+                    spec.to_model()
+                    for spec in specs
+                    if spec.name not in existing and spec.keys not in existing_keys
+                ]
+
+                if missing:
+                    created.extend(await collection.create_indexes(missing))
+        except Exception as e:
+            raise DatabaseError(f'Failed to ensure indexes: {str(e)}')
+
+        return created
+
+index_manager = IndexManager()
\ No newline at end of file
@@ -1,4 +1,5 @@
 from .user_manager import user_manager
 from .provider_manager import provider_manager
+from .sub_provider_manager import sub_provider_manager
 
-__all__ = ['user_manager', 'provider_manager']
\ No newline at end of file
+__all__ = ['user_manager', 'provider_manager', 'sub_provider_manager']
\ No newline at end of file
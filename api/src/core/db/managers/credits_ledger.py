@@ -0,0 +1,99 @@
+import asyncio
+from dataclasses import dataclass
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Dict, Any, Optional
+from ..client import database
+from ..exceptions import DatabaseError
+
+@dataclass
+class CreditsLedgerConfig:
+    flush_interval: float = 1.0
+
+class CreditsLedger:
+    def __init__(self, config: Optional[CreditsLedgerConfig] = None):
+        self.config = config or CreditsLedgerConfig()
+        self.deltas: Dict[Any, int] = {}
+        self.flushing: Dict[Any, int] = {}
+        self.version = 0
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        return database.get_collection('users')
+
+    def record(self, user_id: Any, delta: int) -> None:
+        if delta:
+            self.deltas[user_id] = self.deltas.get(user_id, 0) + delta
+
+    def pending(self, user_id: Any) -> int:
+        return self.deltas.get(user_id, 0) + self.flushing.get(user_id, 0)
+
+    def is_stable(self, user_id: Any, version: int) -> bool:
+        return self.version == version and user_id not in self.flushing
+
+    def _take(self, user_id: Optional[Any] = None) -> Dict[Any, int]:
+        if user_id is None:
+            deltas, self.deltas = self.deltas, {}
+            return deltas
+
+        delta = self.deltas.pop(user_id, 0)
+        return {user_id: delta} if delta else {}
+
+    def _settle(self, deltas: Dict[Any, int]) -> None:
+        for uid, delta in deltas.items():
+            remaining = self.flushing.get(uid, 0) - delta
+            if remaining:
+                self.flushing[uid] = remaining
+            else:
+                self.flushing.pop(uid, None)
+
+    async def flush(self, user_id: Optional[Any] = None) -> None:
+        deltas = self._take(user_id)
+        if not deltas:
+            return
+
+        for uid, delta in deltas.items():
+            self.flushing[uid] = self.flushing.get(uid, 0) + delta
+        self.version += 1
+
+        try:
+            await self.collection.bulk_write(
+                [
+                    UpdateOne({'user_id': uid}, {'$inc': {'credits': delta}})
+                    for uid, delta in deltas.items()
+                ],
+                ordered=False
+            )
+        except Exception as e:
+            self._settle(deltas)
+            for uid, delta in deltas.items():
+                self.record(uid, delta)
+            raise DatabaseError(f'Failed to flush credits: {str(e)}')
+
+        self._settle(deltas)
+        self.version += 1
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.config.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f'Credits ledger error: {str(e)}')
+
+    async def start(self) -> None:
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task and not self.task.done():
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+
+        try:
+            await self.flush()
+        except DatabaseError as e:
+            print(f'Credits ledger shutdown error: {e.message}')
\ No newline at end of file
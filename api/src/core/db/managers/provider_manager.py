@@ -1,15 +1,86 @@
-from typing import Dict, Any, Optional, List
-from motor.motor_asyncio import AsyncIOMotorClient
-from ...config import settings
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from ..client import database
+from ...circuit_breaker import circuit_breakers
+from ...latency import latency_tracker
+
+RouteKey = Tuple[str, bool, bool]
+
+ROUTING_FIELDS = ('models', 'supports_vision', 'supports_tool_calling')
+
+@dataclass
+class RoutingTableConfig:
+    refresh_interval: float = 10.0
 
 class ProviderDatabase:
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        return database.get_collection('providers')
+
+class ProviderRoutingTable:
     def __init__(self):
-        self.client = AsyncIOMotorClient(settings.db_url)
-        self.collection = self.client['db']['providers']
+        self.providers: Dict[str, Dict[str, Any]] = {}
+        self.routes: Dict[RouteKey, List[Dict[str, Any]]] = {}
+        self.loaded = False
+
+    def load(self, providers: List[Dict[str, Any]]) -> None:
+        self.providers = {p['name']: p for p in providers}
+        self.loaded = True
+        self.rebuild()
+
+    def update(self, name: str, new_data: Dict[str, Any]) -> None:
+        is_new = name not in self.providers
+        provider = self.providers.setdefault(name, {'name': name})
+        provider.update(new_data)
+
+        if is_new or any(field in new_data for field in ROUTING_FIELDS):
+            self.rebuild()
+        else:
+            self.resort(provider)
+
+    def increment(self, name: str, deltas: Dict[str, int]) -> None:
+        provider = self.providers.get(name)
+        if provider is None:
+            return
+
+        # Counters are patched in place; routes are re-sorted on the next refresh tick.
+        for field, delta in deltas.items():
+            provider[field] = provider.get(field, 0) + delta
+
+    def resort(self, provider: Dict[str, Any]) -> None:
+        for route, providers in self.routes.items():
+            if any(p is provider for p in providers):
+                self.routes[route] = ProviderManager._sort_providers(providers, route[0])
+
+    def rebuild(self) -> None:
+        routes: Dict[RouteKey, List[Dict[str, Any]]] = {}
+
+        for provider in self.providers.values():
+            vision_options = (False, True) if provider.get('supports_vision') else (False,)
+            tools_options = (False, True) if provider.get('supports_tool_calling') else (False,)
+
+            for model in provider.get('models', []):
+                for vision in vision_options:
+                    for tools in tools_options:
+                        routes.setdefault((model, vision, tools), []).append(provider)
+
+        self.routes = {
+            route: ProviderManager._sort_providers(providers, route[0])
+            for route, providers in routes.items()
+        }
+
+    def get(self, model: str, vision: bool, tools: bool) -> List[Dict[str, Any]]:
+        return self.routes.get((model, vision, tools), [])
 
 class ProviderManager:
-    def __init__(self):
+    def __init__(self, config: Optional[RoutingTableConfig] = None):
         self.db = ProviderDatabase()
+        self.config = config or RoutingTableConfig()
+        self.routing_table = ProviderRoutingTable()
+        self.task: Optional[asyncio.Task] = None
 
     @staticmethod
     def _calculate_availability(
@@ -20,9 +91,15 @@ class ProviderManager:
             return ((usage - failures) / usage) * 100
         return 100.0 - failures
 
+    @staticmethod
+    def _get_tail_latency(provider: Dict[str, Any], model: Optional[str]) -> float:
+        dimension, name = ('model', f'{provider["name"]}/{model}') if model else ('provider', provider['name'])
+        return latency_tracker.get_tail_latency(dimension, name) or 0.0
+
     @staticmethod
     def _sort_providers(
-        providers: List[Dict[str, Any]]
+        providers: List[Dict[str, Any]],
+        model: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         return sorted(
             providers,
@@ -31,23 +108,37 @@ class ProviderManager:
                     x.get('usage', 0),
                     x.get('failures', 0)
                 ),
-                x['usage'],
-                x['latency_avg'],
-                not x['supports_real_streaming']
+                ProviderManager._get_tail_latency(x, model),
+                x.get('usage', 0),
+                not x.get('supports_real_streaming', False)
             )
         )
 
-    def _filter_providers(
-        self,
-        providers: List[Dict[str, Any]],
-        vision: bool = False,
-        tools: bool = False
-    ) -> List[Dict[str, Any]]:
-        if vision:
-            providers = [p for p in providers if p['supports_vision']]
-        if tools:
-            providers = [p for p in providers if p['supports_tool_calling']]
-        return providers
+    async def refresh(self) -> None:
+        providers = await self.db.collection.find({}).to_list(length=None)
+        self.routing_table.load(providers)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.config.refresh_interval)
+                await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f'Provider routing table refresh error: {str(e)}')
+
+    async def start(self) -> None:
+        await self.refresh()
+
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self.task and not self.task.done():
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
 
     async def get_best_provider(
         self,
@@ -55,21 +146,28 @@ class ProviderManager:
         vision: bool = False,
         tools: bool = False
     ) -> Optional[Dict[str, Any]]:
-        providers = await self.db.collection.find(
-            {'models': {'$in': [model]}}
-        ).to_list(length=None)
-
-        if not providers:
-            return None
-
-        sorted_providers = self._sort_providers(providers)
-        filtered_providers = self._filter_providers(
-            sorted_providers,
-            vision=vision,
-            tools=tools
+        if not self.routing_table.loaded:
+            await self.refresh()
+
+        providers = self.routing_table.get(model, bool(vision), bool(tools))
+        return next(
+            (dict(p) for p in providers if circuit_breakers.provider(p['name']).is_available()),
+            None
         )
 
-        return filtered_providers[0] if filtered_providers else None
+    async def get_providers(
+        self,
+        model: str,
+        vision: bool = False,
+        tools: bool = False
+    ) -> List[Dict[str, Any]]:
+        if not self.routing_table.loaded:
+            await self.refresh()
+
+        return [
+            dict(p) for p in self.routing_table.get(model, bool(vision), bool(tools))
+            if circuit_breakers.provider(p['name']).is_available()
+        ]
 
     async def update_provider(
         self,
@@ -77,6 +175,7 @@ class ProviderManager:
         new_data: Dict[str, Any]
     ) -> None:
         update_data = {k: v for k, v in new_data.items() if k != '_id'}
+        self.routing_table.update(name, update_data)
         
         await self.db.collection.find_one_and_update(
             filter={'name': name},
@@ -84,4 +183,18 @@ class ProviderManager:
             upsert=True
         )
 
+    async def _increment(self, name: str, deltas: Dict[str, int]) -> None:
+        self.routing_table.increment(name, deltas)
+
+        await self.db.collection.update_one(
+            {'name': name},
+            {'$inc': deltas}
+        )
+
+    async def record_usage(self, name: str) -> None:
+        await self._increment(name, {'usage': 1})
+
+    async def record_failure(self, name: str) -> None:
+        await self._increment(name, {'failures': 1})
+
 provider_manager = ProviderManager()
\ No newline at end of file
@@ -0,0 +1,152 @@
+import time
+import asyncio
+import contextlib
+from dataclasses import dataclass
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+from ..client import database
+from ...circuit_breaker import circuit_breakers
+
+@dataclass
+class SubProviderPoolConfig:
+    refresh_interval: float = 10.0
+    default_weight: float = 1.0
+
+class SubProviderPool:
+    def __init__(self, config: SubProviderPoolConfig):
+        self.config = config
+        self.sub_providers: Dict[str, Dict[str, Any]] = {}
+        self.routes: Dict[Tuple[str, str], List[str]] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.loaded = False
+
+    def load(self, sub_providers: List[Dict[str, Any]]) -> None:
+        self.sub_providers = {s['api_key']: s for s in sub_providers}
+        self.loaded = True
+        self.rebuild()
+
+    def rebuild(self) -> None:
+        routes: Dict[Tuple[str, str], List[str]] = {}
+
+        for api_key, sub_provider in self.sub_providers.items():
+            for model in sub_provider.get('models', []):
+                routes.setdefault(
+                    (sub_provider.get('main_provider'), model.get('api_name')),
+                    []
+                ).append(api_key)
+
+        self.routes = routes
+
+    def _score(self, api_key: str) -> Tuple[float, float]:
+        sub_provider = self.sub_providers[api_key]
+        weight = sub_provider.get('weight') or self.config.default_weight
+
+        return (
+            (self.in_flight.get(api_key, 0) + 1) / weight,
+            sub_provider.get('last_used', 0)
+        )
+
+    def select(
+        self,
+        main_provider: str,
+        model: str,
+        exclude: Iterable[str] = ()
+    ) -> Optional[Dict[str, Any]]:
+        candidates = [
+            api_key for api_key in self.routes.get((main_provider, model), [])
+            if api_key not in exclude and circuit_breakers.key(api_key).is_available()
+        ]
+
+        if not candidates:
+            return None
+
+        api_key = min(candidates, key=self._score)
+        circuit_breakers.key(api_key).allow_request()
+        self.in_flight[api_key] = self.in_flight.get(api_key, 0) + 1
+        self.sub_providers[api_key]['last_used'] = time.time()
+
+        return dict(self.sub_providers[api_key])
+
+    def release(self, api_key: str) -> None:
+        in_flight = self.in_flight.get(api_key, 0) - 1
+
+        if in_flight > 0:
+            self.in_flight[api_key] = in_flight
+        else:
+            self.in_flight.pop(api_key, None)
+
+    def remove(self, api_key: str) -> None:
+        circuit_breakers.remove(f'key:{api_key}')
+        if self.sub_providers.pop(api_key, None):
+            self.rebuild()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'sub_providers': len(self.sub_providers),
+            'in_flight': dict(self.in_flight)
+        }
+
+class SubProviderManager:
+    def __init__(self, config: Optional[SubProviderPoolConfig] = None):
+        self.config = config or SubProviderPoolConfig()
+        self.pool = SubProviderPool(self.config)
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        return database.get_collection('sub_providers')
+
+    async def refresh(self) -> None:
+        sub_providers = await self.collection.find({}).to_list(length=None)
+        self.pool.load(sub_providers)
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.config.refresh_interval)
+                await self.refresh()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f'Sub-provider pool refresh error: {str(e)}')
+
+    async def start(self) -> None:
+        await self.refresh()
+
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        if self.task and not self.task.done():
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+
+    async def acquire(
+        self,
+        main_provider: str,
+        model: str,
+        exclude: Iterable[str] = ()
+    ) -> Optional[Dict[str, Any]]:
+        if not self.pool.loaded:
+            await self.refresh()
+
+        return self.pool.select(main_provider, model, exclude)
+
+    def release(self, api_key: str) -> None:
+        self.pool.release(api_key)
+
+    async def record_usage(self, api_key: str) -> None:
+        await self.collection.update_one(
+            {'api_key': api_key},
+            {
+                '$inc': {'usage': 1},
+                '$set': {'last_used': time.time()}
+            }
+        )
+
+    async def disable(self, api_key: str) -> None:
+        self.pool.remove(api_key)
+        await self.collection.delete_one({'api_key': api_key})
+
+sub_provider_manager = SubProviderManager()
\ No newline at end of file
@@ -1,27 +1,163 @@
-from typing import Dict, Any, Optional
-from motor.motor_asyncio import AsyncIOMotorClient
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from ..client import database
 from ..exceptions import DatabaseError
+from .credits_ledger import CreditsLedger
 from ...config import settings
+from ...metrics import metrics
+
+@dataclass
+class UserCacheConfig:
+    ttl: float = settings.user_cache_ttl
+    max_size: int = settings.user_cache_max_size
+    negative_ttl: float = settings.user_cache_negative_ttl
+
+class UserCache:
+    def __init__(self, config: Optional[UserCacheConfig] = None):
+        self.config = config or UserCacheConfig()
+        self.entries: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self.keys_by_user_id: Dict[Any, str] = {}
+        self.unknown_keys: OrderedDict[str, float] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+
+        if not entry or entry[0] < time.monotonic():
+            if entry:
+                self.invalidate(key)
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry[1])
+
+    def peek(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        return entry[1] if entry and entry[0] >= time.monotonic() else None
+
+    def is_unknown(self, key: str) -> bool:
+        expires_at = self.unknown_keys.get(key)
+
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self.unknown_keys[key]
+            return False
+        return True
+
+    def set_unknown(self, key: str) -> None:
+        self.unknown_keys[key] = time.monotonic() + self.config.negative_ttl
+        self.unknown_keys.move_to_end(key)
+
+        while len(self.unknown_keys) > self.config.max_size:
+            self.unknown_keys.popitem(last=False)
+
+    def set(self, user: Dict[str, Any]) -> None:
+        key = user.get('key')
+        if not key:
+            return
+
+        self.unknown_keys.pop(key, None)
+        previous_key = self.keys_by_user_id.get(user.get('user_id'))
+        if previous_key and previous_key != key:
+            self.invalidate(previous_key)
+
+        self.entries[key] = (time.monotonic() + self.config.ttl, dict(user))
+        self.entries.move_to_end(key)
+        self.keys_by_user_id[user.get('user_id')] = key
+
+        while len(self.entries) > self.config.max_size:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.keys_by_user_id.pop(evicted.get('user_id'), None)
+
+    def adjust_credits(self, user_id: Any, delta: int) -> None:
+        key = self.keys_by_user_id.get(user_id)
+        entry = self.entries.get(key) if key else None
+
+        if entry:
+            entry[1]['credits'] = entry[1].get('credits', 0) + delta
+
+    def invalidate(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.keys_by_user_id.pop(entry[1].get('user_id'), None)
+
+    def invalidate_user(self, user_id: Any) -> None:
+        key = self.keys_by_user_id.get(user_id)
+        if key:
+            self.invalidate(key)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'unknown_keys': len(self.unknown_keys),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
 
 class UserDatabase:
-    def __init__(self):
-        self.client = AsyncIOMotorClient(settings.db_url)
-        self.collection = self.client['db']['users']
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        return database.get_collection('users')
+
+    @property
+    def read_collection(self) -> AsyncIOMotorCollection:
+        # Only for uncached reads that tolerate replication lag.
+        return database.get_collection('users', secondary_reads=True)
 
 class UserManager:
     def __init__(self):
         self.db = UserDatabase()
+        self.cache = UserCache()
+        self.ledger = CreditsLedger()
+
+    def _apply_pending_credits(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        pending = self.ledger.pending(user.get('user_id'))
+        if pending:
+            user['credits'] = user.get('credits', 0) + pending
+        return user
 
     async def get_user(
         self,
         user_id: Optional[int] = None,
         key: Optional[str] = None
     ) -> Optional[Dict[str, Any]]:
+        if not user_id and key:
+            cached_user = self.cache.get(key)
+            if cached_user:
+                return cached_user
+            if self.cache.is_unknown(key):
+                return None
+
+        start = time.perf_counter()
+        version = self.ledger.version
+
         try:
+            # Always the primary: the result is cached for a full TTL, so a lagging
+            # secondary could resurrect a ban or credits that were already spent.
             query = {'user_id': user_id} if user_id else {'key': key}
-            return await self.db.collection.find_one(query)
+            user = await self.db.collection.find_one(query)
         except Exception as e:
             raise DatabaseError(f'Failed to retrieve user: {str(e)}')
+        finally:
+            metrics.phase_duration.observe(time.perf_counter() - start, 'db')
+
+        if user:
+            self._apply_pending_credits(user)
+            if self.ledger.is_stable(user.get('user_id'), version):
+                self.cache.set(user)
+        elif key and not user_id:
+            self.cache.set_unknown(key)
+
+        return user
 
     async def update_user(
         self,
@@ -29,16 +165,38 @@ class UserManager:
         new_data: Dict[str, Any],
         upsert: bool = True
     ) -> Optional[Dict[str, Any]]:
+        version = self.ledger.version
+
         try:
             update_data = {k: v for k, v in new_data.items() if k != '_id'}
             
-            return await self.db.collection.find_one_and_update(
+            user = await self.db.collection.find_one_and_update(
                 filter={'user_id': user_id},
                 update={'$set': update_data},
                 upsert=upsert,
                 return_document=True
             )
         except Exception as e:
+            self.cache.invalidate_user(user_id)
             raise DatabaseError(f'Failed to update user: {str(e)}')
 
+        if user:
+            self._apply_pending_credits(user)
+        if user and self.ledger.is_stable(user.get('user_id'), version):
+            self.cache.set(user)
+        else:
+            self.cache.invalidate_user(user_id)
+
+        return user
+
+    def deduct_credits(self, user_id: Any, amount: int) -> None:
+        self.ledger.record(user_id, -amount)
+        self.cache.adjust_credits(user_id, -amount)
+
+    async def flush_credits(self, user_id: Optional[Any] = None) -> None:
+        try:
+            await self.ledger.flush(user_id)
+        except DatabaseError as e:
+            print(f'{e.message}, retrying on the next ledger flush')
+
 user_manager = UserManager()
\ No newline at end of file
@@ -0,0 +1,83 @@
+import httpx
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+@dataclass
+class HTTPClientConfig:
+    timeout: float = 100
+    connect_timeout: float = 10
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30
+    http2: bool = False
+    verify: bool = True
+
+class HTTPClientManager:
+    def __init__(self):
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _supports_http2() -> bool:
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _create_client(self, config: HTTPClientConfig) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry
+            ),
+            http2=config.http2 and self._supports_http2(),
+            verify=config.verify
+        )
+
+    def open(
+        self,
+        base_url: str,
+        config: Optional[HTTPClientConfig] = None
+    ) -> httpx.AsyncClient:
+        client = self.clients.get(base_url)
+
+        if not client or client.is_closed:
+            client = self._create_client(config or HTTPClientConfig())
+            self.clients[base_url] = client
+
+        return client
+
+    def get(self, base_url: str) -> httpx.AsyncClient:
+        return self.open(base_url)
+
+    async def close(self) -> None:
+        clients, self.clients = self.clients, {}
+
+        for client in clients.values():
+            await client.aclose()
+
+    @staticmethod
+    def _get_pool_stats(client: httpx.AsyncClient) -> Dict[str, int]:
+        pool = getattr(getattr(client, '_transport', None), '_pool', None)
+        connections = list(getattr(pool, 'connections', []))
+        requests = list(getattr(pool, '_requests', []))
+        idle = sum(1 for c in connections if c.is_idle())
+
+        return {
+            'connections': len(connections),
+            'active': len(connections) - idle,
+            'idle': idle,
+            'in_flight': len(requests),
+            'queued': sum(1 for r in requests if r.connection is None)
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            base_url: self._get_pool_stats(client)
+            for base_url, client in self.clients.items()
+            if not client.is_closed
+        }
+
+http_client_manager = HTTPClientManager()
\ No newline at end of file
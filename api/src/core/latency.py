@@ -0,0 +1,244 @@
+import math
+import hashlib
+import contextlib
+import time
+import asyncio
+from datetime import datetime, timezone, timedelta
+from dataclasses import dataclass
+from pymongo import UpdateOne
+from motor.motor_asyncio import AsyncIOMotorCollection
+from typing import Dict, Any, Tuple, Optional
+from .db.client import database
+
+HistogramKey = Tuple[str, str, str]
+
+@dataclass
+class LatencyConfig:
+    min_value: float = 0.001
+    max_value: float = 600.0
+    buckets_per_decade: int = 20
+    flush_interval: float = 30.0
+    window: int = 3600
+    windows_kept: int = 2
+    retention: int = 86400
+    collection: str = 'latency_stats'
+    tail_metric: str = 'ttft'
+    tail_fallback_metric: str = 'total'
+    tail_quantile: float = 0.95
+
+class LatencyHistogram:
+    def __init__(self, config: LatencyConfig):
+        self.config = config
+        self.size = math.ceil(math.log10(config.max_value / config.min_value) * config.buckets_per_decade) + 1
+        self.counts = [0] * self.size
+        self.total = 0
+
+    def bucket(self, value: float) -> int:
+        if value <= self.config.min_value:
+            return 0
+        index = int(math.log10(value / self.config.min_value) * self.config.buckets_per_decade)
+        return min(index, self.size - 1)
+
+    def upper_bound(self, index: int) -> float:
+        return self.config.min_value * 10 ** ((index + 1) / self.config.buckets_per_decade)
+
+    def add(self, index: int, count: int = 1) -> None:
+        self.counts[index] += count
+        self.total += count
+
+    def record(self, value: float) -> None:
+        self.add(self.bucket(value))
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.total:
+            return None
+
+        target = q * self.total
+        seen = 0
+
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.upper_bound(index)
+
+        return self.upper_bound(self.size - 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'count': self.total,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99)
+        }
+
+class LatencyTracker:
+    def __init__(self, config: Optional[LatencyConfig] = None):
+        self.config = config or LatencyConfig()
+        self.histograms: Dict[HistogramKey, LatencyHistogram] = {}
+        self.tail_latencies: Dict[Tuple[str, str], float] = {}
+        self.pending: Dict[HistogramKey, Dict[int, int]] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        return database.get_collection(self.config.collection)
+
+    @staticmethod
+    def key_id(api_key: str) -> str:
+        # Stats are persisted and exported, so upstream keys are only ever stored as a short digest.
+        return hashlib.blake2b(api_key.encode(), digest_size=6).hexdigest()
+
+    def _get_histogram(self, key: HistogramKey) -> LatencyHistogram:
+        histogram = self.histograms.get(key)
+
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram(self.config)
+
+        return histogram
+
+    def record(
+        self,
+        metric: str,
+        value: float,
+        provider: str,
+        model: Optional[str] = None,
+        api_key: Optional[str] = None
+    ) -> None:
+        keys = [(metric, 'provider', provider)]
+        if model:
+            keys.append((metric, 'model', f'{provider}/{model}'))
+        if api_key:
+            keys.append((metric, 'key', self.key_id(api_key)))
+
+        for key in keys:
+            histogram = self._get_histogram(key)
+            index = histogram.bucket(value)
+            histogram.add(index)
+
+            pending = self.pending.setdefault(key, {})
+            pending[index] = pending.get(index, 0) + 1
+
+    def get_percentile(
+        self,
+        metric: str,
+        dimension: str,
+        name: str,
+        q: float
+    ) -> Optional[float]:
+        histogram = self.histograms.get((metric, dimension, name))
+        return histogram.percentile(q) if histogram else None
+
+    def get_tail_latency(self, dimension: str, name: str) -> Optional[float]:
+        return self.tail_latencies.get((dimension, name))
+
+    def _compute_tail_latencies(self) -> Dict[Tuple[str, str], float]:
+        # TTFT is only recorded for streams; names that never streamed fall back to full request duration.
+        tails: Dict[Tuple[str, str], float] = {}
+
+        for metric in (self.config.tail_metric, self.config.tail_fallback_metric):
+            for (histogram_metric, dimension, name), histogram in self.histograms.items():
+                if (
+                    histogram_metric == metric and
+                    dimension in ('provider', 'model') and
+                    histogram.total and
+                    (dimension, name) not in tails
+                ):
+                    tails[(dimension, name)] = histogram.percentile(self.config.tail_quantile)
+
+        return tails
+
+    def _current_window(self) -> int:
+        return int(time.time()) // self.config.window * self.config.window
+
+    async def flush(self) -> None:
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+
+        window = self._current_window()
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.config.retention)
+
+        try:
+            await self.collection.bulk_write([
+                UpdateOne(
+                    {'_id': f'{metric}|{dimension}|{name}|{window}'},
+                    {
+                        '$inc': {f'counts.{index}': count for index, count in counts.items()},
+                        '$setOnInsert': {
+                            'metric': metric,
+                            'dimension': dimension,
+                            'name': name,
+                            'window': window,
+                            'expires_at': expires_at
+                        }
+                    },
+                    upsert=True
+                )
+                for (metric, dimension, name), counts in pending.items()
+            ], ordered=False)
+        except Exception:
+            for key, counts in pending.items():
+                merged = self.pending.setdefault(key, {})
+                for index, count in counts.items():
+                    merged[index] = merged.get(index, 0) + count
+            raise
+
+    async def load(self) -> None:
+        since = self._current_window() - (self.config.windows_kept - 1) * self.config.window
+        histograms: Dict[HistogramKey, LatencyHistogram] = {}
+
+        async for document in self.collection.find({'window': {'$gte': since}}):
+            key = (document['metric'], document['dimension'], document['name'])
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = LatencyHistogram(self.config)
+
+            for index, count in document.get('counts', {}).items():
+                histogram.add(min(int(index), histogram.size - 1), count)
+
+        for key, counts in self.pending.items():
+            histogram = histograms.get(key)
+            if histogram is None:
+                histogram = histograms[key] = LatencyHistogram(self.config)
+
+            for index, count in counts.items():
+                histogram.add(index, count)
+
+        self.histograms = histograms
+        self.tail_latencies = self._compute_tail_latencies()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.config.flush_interval)
+                await self.flush()
+                await self.load()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f'Latency stats flush error: {str(e)}')
+
+    async def start(self) -> None:
+        await self.load()
+
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task and not self.task.done():
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+
+        try:
+            await self.flush()
+        except Exception as e:
+            print(f'Failed to flush latency stats: {str(e)}')
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            '|'.join(key): histogram.get_stats()
+            for key, histogram in self.histograms.items()
+        }
+
+latency_tracker = LatencyTracker()
\ No newline at end of file
@@ -0,0 +1,313 @@
+import os
+import time
+import ujson
+import asyncio
+import tempfile
+from bisect import bisect_left
+from urllib.parse import urlsplit
+from dataclasses import dataclass
+from typing import Dict, Any, List, Tuple, Callable, Optional
+from .config import settings
+
+Labels = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+@dataclass
+class MetricsConfig:
+    snapshot_dir: str = settings.metrics_dir or os.path.join(tempfile.gettempdir(), 'api-metrics')
+    snapshot_interval: float = 5.0
+    stale_after: float = 60.0
+
+class Counter:
+    type = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Labels = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, *labels: str, value: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def snapshot(self) -> List[Any]:
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+class Gauge(Counter):
+    type = 'gauge'
+
+    def __init__(self, name: str, help: str, labels: Labels = (), per_process: bool = False):
+        # Per-process gauges carry a pid label so aggregation never sums values like averages or maxima.
+        super().__init__(name, help, (*labels, 'pid') if per_process else labels)
+        self.per_process = per_process
+
+    def snapshot(self) -> List[Any]:
+        if not self.per_process:
+            return super().snapshot()
+
+        pid = str(os.getpid())
+        return [[[*labels, pid], value] for labels, value in self.values.items()]
+
+    def dec(self, *labels: str, value: float = 1) -> None:
+        self.values[labels] = self.values.get(labels, 0) - value
+
+    def set(self, *labels: str, value: float) -> None:
+        self.values[labels] = value
+
+class Histogram:
+    type = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self.values: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        state = self.values.get(labels)
+
+        if state is None:
+            state = self.values[labels] = [0] * (len(self.buckets) + 3)
+
+        state[bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def snapshot(self) -> List[Any]:
+        return [[list(labels), list(state)] for labels, state in self.values.items()]
+
+class MetricsRegistry:
+    def __init__(self, config: Optional[MetricsConfig] = None):
+        self.config = config or MetricsConfig()
+        self.metrics: Dict[str, Any] = {}
+        self.collectors: List[Callable[[], None]] = []
+        self.task: Optional[asyncio.Task] = None
+
+    def _register(self, metric: Any) -> Any:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Labels = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Labels = (), per_process: bool = False) -> Gauge:
+        return self._register(Gauge(name, help, labels, per_process))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Labels = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self.collectors.append(collector)
+
+    @property
+    def snapshot_path(self) -> str:
+        return os.path.join(self.config.snapshot_dir, f'{os.getpid()}.json')
+
+    def snapshot(self) -> Dict[str, Any]:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception as e:
+                print(f'Metrics collector error: {str(e)}')
+
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        os.makedirs(self.config.snapshot_dir, exist_ok=True)
+        temp_path = f'{self.snapshot_path}.tmp'
+
+        with open(temp_path, 'w') as f:
+            ujson.dump(snapshot, f)
+
+        os.replace(temp_path, self.snapshot_path)
+
+    def _read_snapshots(self) -> List[Dict[str, Any]]:
+        snapshots = []
+        now = time.time()
+
+        for file in os.listdir(self.config.snapshot_dir):
+            if not file.endswith('.json'):
+                continue
+
+            path = os.path.join(self.config.snapshot_dir, file)
+
+            try:
+                if now - os.path.getmtime(path) > self.config.stale_after:
+                    os.remove(path)
+                    continue
+
+                with open(path) as f:
+                    snapshots.append(ujson.load(f))
+            except (OSError, ValueError):
+                continue
+
+        return snapshots
+
+    def aggregate(self, snapshot: Dict[str, Any]) -> Dict[str, Dict[Labels, Any]]:
+        self._write(snapshot)
+        totals: Dict[str, Dict[Labels, Any]] = {name: {} for name in self.metrics}
+
+        for snapshot in self._read_snapshots():
+            for name, values in snapshot.items():
+                if name not in totals:
+                    continue
+
+                for labels, value in values:
+                    labels = tuple(labels)
+                    current = totals[name].get(labels)
+
+                    if isinstance(value, list):
+                        totals[name][labels] = (
+                            [a + b for a, b in zip(current, value)] if current else value
+                        )
+                    else:
+                        totals[name][labels] = (current or 0) + value
+
+        return totals
+
+    @staticmethod
+    def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+        if not names:
+            return ''
+
+        pairs = ','.join(
+            '{}="{}"'.format(name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in zip(names, values)
+        )
+        return f'{{{pairs}}}'
+
+    def render(self, snapshot: Dict[str, Any]) -> str:
+        lines = []
+
+        for name, values in self.aggregate(snapshot).items():
+            metric = self.metrics[name]
+            lines.append(f'# HELP {name} {metric.help}')
+            lines.append(f'# TYPE {name} {metric.type}')
+
+            for labels, value in values.items():
+                if metric.type != 'histogram':
+                    lines.append(f'{name}{self._format_labels(metric.labels, labels)} {value}')
+                    continue
+
+                cumulative = 0
+                for bound, count in zip((*metric.buckets, '+Inf'), value[:-2]):
+                    cumulative += count
+                    bucket_labels = self._format_labels((*metric.labels, 'le'), (*labels, str(bound)))
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+
+                label_text = self._format_labels(metric.labels, labels)
+                lines.append(f'{name}_sum{label_text} {value[-2]}')
+                lines.append(f'{name}_count{label_text} {value[-1]}')
+
+        return '\n'.join(lines) + '\n'
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.config.snapshot_interval)
+                await asyncio.to_thread(self._write, self.snapshot())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f'Metrics snapshot error: {str(e)}')
+
+    async def start(self) -> None:
+        if not self.task or self.task.done():
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+        try:
+            os.remove(self.snapshot_path)
+        except OSError:
+            pass
+
+class APIMetrics:
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.requests = registry.counter(
+            'api_requests_total', 'HTTP requests handled.', ('route', 'method', 'status')
+        )
+        self.request_duration = registry.histogram(
+            'api_request_duration_seconds', 'HTTP request duration, including streamed bodies.', ('route',)
+        )
+        self.phase_duration = registry.histogram(
+            'api_phase_duration_seconds', 'Duration of request phases.', ('phase',)
+        )
+        self.upstream_responses = registry.counter(
+            'api_upstream_responses_total', 'Upstream responses by status code.', ('provider', 'status')
+        )
+        self.active_streams = registry.gauge(
+            'api_active_streams', 'Streaming responses currently open.', ('provider',)
+        )
+        self.streamed_tokens = registry.counter(
+            'api_streamed_tokens_total', 'Completion tokens streamed to clients.', ('provider',)
+        )
+        self.credits_refills = registry.counter(
+            'api_credits_refill_runs_total', 'Daily credits refill runs.'
+        )
+        self.credits_refilled_users = registry.counter(
+            'api_credits_refilled_users_total', 'Users refilled by the daily credits job.'
+        )
+        self.credits_refill_duration = registry.histogram(
+            'api_credits_refill_duration_seconds', 'Duration of daily credits refill runs.'
+        )
+        self.cache_lookups = registry.counter(
+            'api_cache_lookups_total', 'Response cache lookups by serving tier.', ('cache', 'result')
+        )
+        self.cache_bytes_saved = registry.counter(
+            'api_cache_bytes_saved_total', 'Upstream response bytes served from cache.', ('cache',)
+        )
+        self.forwarded_bytes = registry.histogram(
+            'api_forwarded_bytes',
+            'Bytes per forwarded upload request, by direction.',
+            ('direction',),
+            buckets=tuple(4 ** exponent * 1024 for exponent in range(9))
+        )
+        self.embeddings_batch_items = registry.histogram(
+            'api_embeddings_batch_items',
+            'Inputs per coalesced upstream embeddings request.',
+            buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048)
+        )
+        self.db_pool = registry.gauge(
+            'api_db_pool', 'MongoDB connection pool statistics.', ('stat',), per_process=True
+        )
+        self.http_pool = registry.gauge(
+            'api_http_pool', 'Upstream HTTP connection pool statistics.', ('host', 'stat'), per_process=True
+        )
+
+    def collect_pool_stats(
+        self,
+        db_stats: Callable[[], Dict[str, Any]],
+        http_stats: Callable[[], Dict[str, Dict[str, int]]]
+    ) -> None:
+        def collect() -> None:
+            for stat, value in db_stats().items():
+                self.db_pool.set(stat, value=value)
+
+            self.http_pool.values.clear()
+            for base_url, stats in http_stats().items():
+                # Base URLs can carry credentials in the path or query (e.g. webhook tokens), so only the host is exported.
+                host = urlsplit(base_url).hostname or 'unknown'
+                for stat, value in stats.items():
+                    self.http_pool.inc(host, stat, value=value)
+
+        self.registry.add_collector(collect)
+
+metrics = APIMetrics(MetricsRegistry())
\ No newline at end of file
@@ -0,0 +1,208 @@
+import os
+import mmap
+import time
+import struct
+import hashlib
+import tempfile
+from dataclasses import dataclass, field
+from pymongo import ReturnDocument
+from typing import Dict, List, Tuple, Optional
+from .db import database
+from .config import settings
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+@dataclass(frozen=True)
+class RateLimit:
+    count: int
+    period: float
+
+    @property
+    def emission_interval(self) -> float:
+        return self.period / self.count
+
+@dataclass
+class RateLimiterConfig:
+    backend: str = settings.rate_limit_backend
+    shared_path: str = settings.rate_limit_file or os.path.join(tempfile.gettempdir(), 'api-rate-limits')
+    buckets: int = 4096
+    ways: int = 8
+    max_limits: int = 4
+    collection: str = 'rate_limits'
+    tiers: Dict[int, Tuple[RateLimit, ...]] = field(default_factory=lambda: {
+        0: (RateLimit(2, 1), RateLimit(30, 60)),
+        1: (RateLimit(5, 1), RateLimit(120, 60))
+    })
+
+class GCRA:
+    @staticmethod
+    def apply(
+        tats: List[float],
+        limits: Tuple[RateLimit, ...],
+        now: float
+    ) -> Tuple[List[float], float]:
+        new_tats = []
+        retry_after = 0.0
+
+        for index, limit in enumerate(limits):
+            tat = max(tats[index] if index < len(tats) else 0.0, now)
+            new_tat = tat + limit.emission_interval
+            retry_after = max(retry_after, new_tat - limit.period - now)
+            new_tats.append(new_tat)
+
+        return new_tats, retry_after
+
+class MemoryBackend:
+    def __init__(self, _: RateLimiterConfig):
+        self.tats: Dict[str, List[float]] = {}
+
+    async def hit(self, key: str, limits: Tuple[RateLimit, ...]) -> float:
+        now = time.time()
+        new_tats, retry_after = GCRA.apply(self.tats.get(key, []), limits, now)
+
+        if retry_after <= 0:
+            self.tats[key] = new_tats
+
+        return retry_after
+
+    def close(self) -> None:
+        self.tats.clear()
+
+class SharedMemoryBackend:
+    def __init__(self, config: RateLimiterConfig):
+        self.config = config
+        self.slot = struct.Struct(f'16s{config.max_limits}d')
+        self.bucket_size = self.slot.size * config.ways
+        size = self.bucket_size * config.buckets
+
+        self.fd = os.open(config.shared_path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self.fd).st_size < size:
+            os.ftruncate(self.fd, size)
+        self.memory = mmap.mmap(self.fd, size)
+
+    def _find_slot(self, bucket_offset: int, digest: bytes, now: float) -> Tuple[int, List[float]]:
+        victim, victim_tat = bucket_offset, None
+
+        for way in range(self.config.ways):
+            offset = bucket_offset + way * self.slot.size
+            slot_key, *tats = self.slot.unpack_from(self.memory, offset)
+
+            if slot_key == digest:
+                return offset, tats
+
+            newest = max(tats)
+            if victim_tat is None or newest < victim_tat:
+                victim, victim_tat = offset, newest
+
+        return victim, []
+
+    async def hit(self, key: str, limits: Tuple[RateLimit, ...]) -> float:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        bucket_offset = int.from_bytes(digest[:8], 'little') % self.config.buckets * self.bucket_size
+
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, self.bucket_size, bucket_offset)
+        try:
+            now = time.time()
+            offset, tats = self._find_slot(bucket_offset, digest, now)
+            new_tats, retry_after = GCRA.apply(tats, limits, now)
+
+            if retry_after <= 0:
+                padding = [0.0] * (self.config.max_limits - len(new_tats))
+                self.slot.pack_into(self.memory, offset, digest, *new_tats, *padding)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, self.bucket_size, bucket_offset)
+
+        return retry_after
+
+    def close(self) -> None:
+        self.memory.close()
+        os.close(self.fd)
+
+class MongoBackend:
+    NOW = {'$divide': [{'$toLong': '$$NOW'}, 1000]}
+
+    def __init__(self, config: RateLimiterConfig):
+        self.config = config
+
+    def _build_pipeline(self, limits: Tuple[RateLimit, ...]) -> List[Dict]:
+        new_tats = [
+            {'$add': [
+                {'$max': [{'$ifNull': [{'$arrayElemAt': ['$tats', index]}, 0]}, self.NOW]},
+                limit.emission_interval
+            ]}
+            for index, limit in enumerate(limits)
+        ]
+        waits = [
+            {'$subtract': [{'$subtract': [tat, limit.period]}, self.NOW]}
+            for tat, limit in zip(new_tats, limits)
+        ]
+
+        return [
+            {'$set': {'retry_after': {'$max': waits}}},
+            {'$set': {
+                'tats': {'$cond': [
+                    {'$gt': ['$retry_after', 0]},
+                    {'$ifNull': ['$tats', []]},
+                    new_tats
+                ]},
+                'expires_at': {'$add': ['$$NOW', max(limit.period for limit in limits) * 1000]}
+            }}
+        ]
+
+    async def hit(self, key: str, limits: Tuple[RateLimit, ...]) -> float:
+        result = await database.get_collection(self.config.collection).find_one_and_update(
+            {'_id': key},
+            self._build_pipeline(limits),
+            projection={'retry_after': True},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return result['retry_after']
+
+    def close(self) -> None:
+        pass
+
+class RateLimiter:
+    BACKENDS = {
+        'memory': MemoryBackend,
+        'shared': SharedMemoryBackend,
+        'mongo': MongoBackend
+    }
+
+    def __init__(self, config: Optional[RateLimiterConfig] = None):
+        self.config = config or RateLimiterConfig()
+        self.backend = None
+
+        for limits in self.config.tiers.values():
+            if len(limits) > self.config.max_limits:
+                raise ValueError(f'At most {self.config.max_limits} limits are supported per tier')
+
+    def _create_backend(self):
+        backend = self.config.backend
+
+        if backend == 'shared' and fcntl is None:
+            backend = 'memory'
+
+        if backend not in self.BACKENDS:
+            raise ValueError(f'Unknown rate limit backend: {backend}')
+
+        return self.BACKENDS[backend](self.config)
+
+    def get_limits(self, tier: int) -> Tuple[RateLimit, ...]:
+        return self.config.tiers.get(tier) or self.config.tiers[0]
+
+    async def hit(self, key: str, tier: int) -> float:
+        if self.backend is None:
+            self.backend = self._create_backend()
+
+        return await self.backend.hit(key, self.get_limits(tier))
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+
+rate_limiter = RateLimiter()
\ No newline at end of file
@@ -1,9 +1,9 @@
+import math
 from dataclasses import dataclass
 from typing import Dict, Any, Callable, Awaitable, Type, Union, Optional
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.exceptions import ValidationException
-from slowapi.errors import RateLimitExceeded
-from .api import ValidationError, AccessError, AuthenticationError
+from .api import ValidationError, AccessError, AuthenticationError, RateLimitError, PayloadTooLargeError
 from .responses import JSONResponse
 
 @dataclass
@@ -35,10 +35,11 @@ class ExceptionHandler:
             Exception: self._handle_generic_exception,
             AccessError: self._handle_http_exception,
             AuthenticationError: self._handle_http_exception,
+            PayloadTooLargeError: self._handle_http_exception,
             HTTPException: self._handle_http_exception,
             ValidationError: self._handle_validation_exception,
             ValidationException: self._handle_validation_exception,
-            RateLimitExceeded: self._handle_rate_limit_exceeded
+            RateLimitError: self._handle_rate_limit_exceeded
         })
 
     @staticmethod
@@ -100,7 +101,7 @@ class ExceptionHandler:
     async def _handle_http_exception(
         self,
         _: Request,
-        exc: Union[HTTPException, AccessError, AuthenticationError]
+        exc: Union[HTTPException, AccessError, AuthenticationError, PayloadTooLargeError]
     ) -> JSONResponse:
         error_response = self._create_error_response(
             message=exc.detail if hasattr(exc, 'detail') else exc.message,
@@ -113,15 +114,17 @@ class ExceptionHandler:
     async def _handle_rate_limit_exceeded(
         self,
         _: Request,
-        exc: RateLimitExceeded
+        exc: RateLimitError
     ) -> JSONResponse:
         error_response = self._create_error_response(
-            message=f'Rate limit exceeded: {exc.detail}',
-            error_type='invalid_request_error',
-            code=400,
+            message=exc.message,
+            error_type='rate_limit_error',
+            code=429,
             status_code=exc.status_code
         )
-        return self._create_json_response(error_response)
+        response = self._create_json_response(error_response)
+        response.headers['Retry-After'] = str(math.ceil(exc.retry_after))
+        return response
 
     def register_handler(
         self,
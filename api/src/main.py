@@ -1,36 +1,60 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter
-from slowapi.middleware import SlowAPIMiddleware
 from contextlib import asynccontextmanager
 from .tasks import CreditsService
-from .providers import BaseProvider
+from .core import (
+    database,
+    index_manager,
+    http_client_manager,
+    rate_limiter,
+    latency_tracker,
+    metrics,
+    embeddings_cache,
+    moderations_cache,
+    user_manager,
+    provider_manager,
+    sub_provider_manager
+)
+from .providers import BaseProvider, webhook_dispatcher
 from .api import main_router
+from .api.middleware import MetricsMiddleware
 from .errors import ExceptionHandler
-from .utils import request_processor
 
 credits_service = CreditsService()
 base_provider = BaseProvider()
 
 @asynccontextmanager
 async def lifespan(_: FastAPI):
+    database.connect()
+    await index_manager.ensure_indexes()
     await credits_service.start()
+    await user_manager.ledger.start()
     await base_provider.import_modules()
+    base_provider.build_registry()
     await base_provider.sync_to_db()
+    base_provider.open_http_clients()
+    await latency_tracker.start()
+    await provider_manager.start()
+    await sub_provider_manager.start()
+    await webhook_dispatcher.start()
+    metrics.collect_pool_stats(database.get_stats, http_client_manager.get_stats)
+    await metrics.registry.start()
     yield
+    await metrics.registry.stop()
+    await provider_manager.stop()
+    await sub_provider_manager.stop()
+    await webhook_dispatcher.stop()
+    await latency_tracker.stop()
     await credits_service.stop()
+    await user_manager.ledger.stop()
+    await http_client_manager.close()
+    rate_limiter.close()
+    embeddings_cache.close()
+    moderations_cache.close()
+    database.close()
  
 app = FastAPI(lifespan=lifespan)
 
-app.state.limiter = Limiter(
-    key_func=request_processor.get_api_key,
-    default_limits=[
-        '2/second',
-        '30/minute'
-    ]
-)
-app.add_middleware(SlowAPIMiddleware)
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=['*'],
@@ -38,6 +62,8 @@ app.add_middleware(
     allow_headers=['*']
 )
 
+app.add_middleware(MetricsMiddleware)
+
 ExceptionHandler().setup(app)
 
 app.include_router(main_router)
\ No newline at end of file
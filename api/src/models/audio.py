@@ -1,10 +1,12 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional
 
 class SpeechRequest(BaseModel):
     model: str
     input: str
     voice: Optional[str] = None
+    response_format: Literal['mp3', 'opus', 'aac', 'flac', 'wav', 'pcm'] = 'mp3'
+    speed: Optional[float] = Field(default=None, le=4.0, ge=0.25)
 
     @field_validator('input')
     @classmethod
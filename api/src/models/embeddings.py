@@ -1,7 +1,7 @@
 from pydantic import BaseModel, field_validator
-from typing import List, Iterable, Optional, Union
+from typing import List, Optional, Union
 
-EmbeddingsInput = Union[str, List[str], Iterable[int], Iterable[Iterable[int]]]
+EmbeddingsInput = Union[str, List[str], List[int], List[List[int]]]
 
 class EmbeddingsRequest(BaseModel):
     model: str
@@ -11,15 +11,11 @@ class EmbeddingsRequest(BaseModel):
     @field_validator('input')
     @classmethod
     def validate_input(cls, value: EmbeddingsInput) -> EmbeddingsInput:
-        if isinstance(value, str) or isinstance(value, list):
-            if not value:
-                raise ValueError('The input field must not have an empty string/array')
-        elif isinstance(value, Iterable) and not isinstance(value, str):
-            if all(isinstance(item, Iterable) for item in value) and not isinstance(value[0], str):
-                if not all(sublist for sublist in value):
-                    raise ValueError('The input field must not have an empty sub-array')
-            else:
-                if not value:
-                    raise ValueError('The input field must not have an empty iterable')
+        if not value:
+            raise ValueError('The input field must not have an empty string/array')
+
+        if isinstance(value, list) and isinstance(value[0], list):
+            if not all(sublist for sublist in value):
+                raise ValueError('The input field must not have an empty sub-array')
 
         return value
\ No newline at end of file
@@ -1,3 +1,4 @@
-from .base_provider import BaseProvider
+from .base_provider import BaseProvider, ModelRegistry
+from .utils import webhook_dispatcher, ProviderUnavailableError
 
-__all__ = ['BaseProvider']
\ No newline at end of file
+__all__ = ['BaseProvider', 'ModelRegistry', 'webhook_dispatcher', 'ProviderUnavailableError']
\ No newline at end of file
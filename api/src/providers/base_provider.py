@@ -1,11 +1,12 @@
 import os
 import inspect
 import importlib
-from dataclasses import dataclass
-from motor.motor_asyncio import AsyncIOMotorClient
+from types import MappingProxyType
+from dataclasses import dataclass, field
+from motor.motor_asyncio import AsyncIOMotorCollection
 from asgiref.sync import sync_to_async
-from typing import List, Dict, Optional, Type, ClassVar
-from ..core import settings
+from typing import List, Dict, Optional, Type, ClassVar, FrozenSet, Mapping, Tuple
+from ..core import database
 
 @dataclass
 class ProviderConfig:
@@ -16,6 +17,18 @@ class ProviderConfig:
     free_models: List[str]
     paid_models: List[str]
     model_prices: Dict[str, int]
+    model_multipliers: Dict[str, float] = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class ModelRegistry:
+    models: Tuple[str, ...]
+    all_models: FrozenSet[str]
+    free_models: FrozenSet[str]
+    paid_models: FrozenSet[str]
+    providers: Mapping[str, Type['BaseProvider']]
+    model_providers: Mapping[str, Tuple[Type['BaseProvider'], ...]]
+    model_prices: Mapping[str, int]
+    model_multipliers: Mapping[str, float]
 
 class BaseProvider:
     config: ClassVar[ProviderConfig] = ProviderConfig(
@@ -27,26 +40,59 @@ class BaseProvider:
         paid_models=[],
         model_prices={}
     )
+    registry: ClassVar[Optional[ModelRegistry]] = None
 
-    def __init__(self):
-        self.db = AsyncIOMotorClient(settings.db_url)['db']['providers']
+    @property
+    def db(self) -> AsyncIOMotorCollection:
+        return database.get_collection('providers')
 
     @classmethod
-    def get_provider_class(cls, name: str) -> Optional[Type['BaseProvider']]:
-        return next(
-            (p for p in cls.__subclasses__() if p.config.name == name),
-            None
+    def build_registry(cls) -> ModelRegistry:
+        providers = BaseProvider.__subclasses__()
+        models: Dict[str, List[Type[BaseProvider]]] = {}
+
+        for provider in providers:
+            for model in provider.config.free_models + provider.config.paid_models:
+                models.setdefault(model, []).append(provider)
+
+        BaseProvider.registry = ModelRegistry(
+            models=tuple(models),
+            all_models=frozenset(models),
+            free_models=frozenset(
+                model for provider in providers
+                for model in provider.config.free_models
+            ),
+            paid_models=frozenset(
+                model for provider in providers
+                for model in provider.config.paid_models
+            ),
+            providers=MappingProxyType({p.config.name: p for p in providers}),
+            model_providers=MappingProxyType({
+                model: tuple(model_providers)
+                for model, model_providers in models.items()
+            }),
+            model_prices=MappingProxyType({
+                model: price for provider in providers
+                for model, price in provider.config.model_prices.items()
+            }),
+            model_multipliers=MappingProxyType({
+                model: multiplier for provider in providers
+                for model, multiplier in provider.config.model_multipliers.items()
+            })
         )
+        return BaseProvider.registry
+
+    @classmethod
+    def get_registry(cls) -> ModelRegistry:
+        return BaseProvider.registry or cls.build_registry()
+
+    @classmethod
+    def get_provider_class(cls, name: str) -> Optional[Type['BaseProvider']]:
+        return cls.get_registry().providers.get(name)
 
     @classmethod
     def get_all_models(cls) -> List[str]:
-        all_models = set()
-        for provider in cls.__subclasses__():
-            all_models.update(
-                provider.config.free_models +
-                provider.config.paid_models
-            )
-        return list(all_models)
+        return list(cls.get_registry().models)
 
     @sync_to_async
     def import_modules(self):
@@ -94,8 +140,7 @@ class BaseProvider:
                     'supports_tool_calling': config.supports_tool_calling,
                     'models': all_models,
                     'usage': 0,
-                    'failures': 0,
-                    'latency_avg': 0
+                    'failures': 0
                 })
 
 
@@ -117,6 +162,14 @@ class BaseProvider:
         except Exception as e:
             raise Exception(f'Failed to sync providers: {str(e)}')
 
+    def open_http_clients(self) -> None:
+        for provider_class in self.__class__.__subclasses__():
+            provider_class.setup_http_client()
+
+    @classmethod
+    def setup_http_client(cls) -> None:
+        pass
+
     @classmethod
     async def chat_completions(cls, **_) -> None:
         raise NotImplementedError
@@ -1,22 +1,53 @@
-import ujson
 import time
 import httpx
-from dataclasses import dataclass
-from fastapi import Request, Response, UploadFile
-from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List, Dict, Any, Tuple, AsyncGenerator, Union
+import asyncio
+from types import SimpleNamespace
+from dataclasses import dataclass, field
+from fastapi import Request, Response
+from typing import List, Dict, Any, Set, Tuple, AsyncGenerator, AsyncIterator, Union, ClassVar, Optional
 from ..models import EmbeddingsInput
 from ..responses import JSONResponse, StreamingResponseWithStatusCode
-from ..core import settings, user_manager, provider_manager
+from ..core import (
+    user_manager,
+    provider_manager,
+    sub_provider_manager,
+    circuit_breakers,
+    latency_tracker,
+    metrics,
+    embeddings_cache,
+    moderations_cache,
+    embeddings_batcher,
+    http_client_manager,
+    HTTPClientConfig
+)
 from ..utils import request_processor
 from .base_provider import BaseProvider, ProviderConfig
-from .utils import WebhookManager, ResponseGenerator, ErrorHandler
+from .utils import WebhookManager, ResponseGenerator, SSEPassthrough, ProviderUnavailableError
 
 @dataclass
 class OpenAIConfig:
     api_base_url: str = 'https://api.openai.com/v1'
     provider_id: str = 'oai'
-    timeout: int = 100
+    stream_usage: bool = True
+    speech_chunk_size: int = 16384
+    speech_media_types: Dict[str, str] = field(
+        default_factory=lambda: {
+            'mp3': 'audio/mpeg',
+            'opus': 'audio/ogg',
+            'aac': 'audio/aac',
+            'flac': 'audio/flac',
+            'wav': 'audio/wav',
+            'pcm': 'audio/pcm'
+        }
+    )
+    http_client: HTTPClientConfig = field(
+        default_factory=lambda: HTTPClientConfig(
+            timeout=100,
+            max_connections=200,
+            max_keepalive_connections=50,
+            keepalive_expiry=60
+        )
+    )
 
 class OpenAI(BaseProvider):
     config = ProviderConfig(
@@ -46,28 +77,61 @@ class OpenAI(BaseProvider):
         ],
         model_prices={}
     )
+    api_config: ClassVar[OpenAIConfig] = OpenAIConfig()
+    closing: ClassVar[Set[asyncio.Task]] = set()
 
-    def __init__(self):
-        super().__init__()
-        self.sub_providers_db = AsyncIOMotorClient(settings.db_url)['db']['sub_providers']
-        self.api_config = OpenAIConfig()
-
-    async def _get_sub_provider(self, model: str) -> Dict[str, Any]:
-        sub_providers = await self.sub_providers_db.find({
-            'main_provider': self.config.name,
-            'models.api_name': {'$in': [model]}
-        }).to_list(length=None)
-        return min(sub_providers, key=lambda x: (x.get('usage', 0), x.get('last_used', 0)))
-
-    async def _update_sub_provider(self, api_key: str, new_data: Dict[str, Any]) -> None:
-        await self.sub_providers_db.find_one_and_update(
-            filter={'api_key': api_key},
-            update={'$set': new_data},
-            upsert=True
+    @classmethod
+    def setup_http_client(cls) -> None:
+        http_client_manager.open(cls.api_config.api_base_url, cls.api_config.http_client)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return http_client_manager.get(self.api_config.api_base_url)
+
+    @staticmethod
+    def _get_excluded_sub_providers(request: Request) -> Set[str]:
+        if not hasattr(request.state, 'excluded_sub_providers'):
+            request.state.excluded_sub_providers = set()
+        return request.state.excluded_sub_providers
+
+    async def _get_sub_provider(self, request: Request, model: str) -> Dict[str, Any]:
+        sub_provider = await sub_provider_manager.acquire(
+            self.config.name,
+            model,
+            exclude=self._get_excluded_sub_providers(request)
         )
+        if not sub_provider:
+            raise ProviderUnavailableError(self.config.name, model)
+        return sub_provider
+
+    def _release_sub_provider(self, sub_provider: Dict[str, Any]) -> None:
+        sub_provider_manager.release(sub_provider['api_key'])
+
+    def _close_stream(self, request: Request, response: httpx.Response) -> None:
+        # Runs as its own task so a client disconnect cannot cancel the upstream close or the credit flush.
+        task = asyncio.create_task(self._finish_stream(request, response))
+        self.closing.add(task)
+        task.add_done_callback(self.closing.discard)
+
+    async def _finish_stream(self, request: Request, response: httpx.Response) -> None:
+        try:
+            await response.aclose()
+        finally:
+            await user_manager.flush_credits(request.state.user['user_id'])
 
     async def _disable_sub_provider(self, api_key: str) -> None:
-        await self.sub_providers_db.delete_one(filter={'api_key': api_key})
+        await sub_provider_manager.disable(api_key)
+
+    def _build_transcript_response(self, response: httpx.Response) -> Response:
+        # text, srt and vtt formats come back as plain bodies; they are forwarded untouched.
+        content_type = response.headers.get('content-type', '')
+        if not content_type.startswith('application/json'):
+            return Response(response.content, media_type=content_type or 'text/plain')
+
+        return JSONResponse({
+            'provider_id': self.api_config.provider_id,
+            **response.json()
+        })
 
     def _generate_error_response(self, message: str = 'Something went wrong. Try again later.') -> JSONResponse:
         return JSONResponse(
@@ -82,19 +146,81 @@ class OpenAI(BaseProvider):
             status_code=500
         )
 
-    async def _handle_error(self, request: Request, model: str, status_code: int) -> None:
+    async def _handle_error(
+        self,
+        request: Request,
+        model: str,
+        status_code: int,
+        exception: Optional[str] = None
+    ) -> None:
         await WebhookManager.send_to_webhook(
             request=request,
             is_error=True,
             model=model,
             pid=self.api_config.provider_id,
-            exception=f'Status Code: {status_code}'
+            exception=exception or f'Status Code: {status_code}'
         )
-        request.state.provider['failures'] += 1
-        await provider_manager.update_provider(self.config.name, request.state.provider)
+        await provider_manager.record_failure(self.config.name)
+
+    def _record_outcome(
+        self,
+        sub_provider: Dict[str, Any],
+        success: bool,
+        start: float,
+        status_code: Optional[int] = None
+    ) -> None:
+        if status_code is not None:
+            metrics.upstream_responses.inc(self.config.name, str(status_code))
+        circuit_breakers.key(sub_provider['api_key']).record(success, time.time() - start)
+
+    async def _handle_upstream_error(
+        self,
+        request: Request,
+        model: str,
+        sub_provider: Dict[str, Any],
+        start: float,
+        status_code: int,
+        exception: Optional[str] = None
+    ) -> None:
+        self._record_outcome(sub_provider, status_code < 500 and status_code != 429, start, status_code)
+        self._get_excluded_sub_providers(request).add(sub_provider['api_key'])
+        if status_code in [401, 403, 429]:
+            await self._disable_sub_provider(sub_provider['api_key'])
+        await self._handle_error(request, model, status_code, exception)
+
+    async def _request(
+        self,
+        request: Request,
+        model: str,
+        path: str,
+        headers: Optional[Dict[str, str]] = None,
+        **kwargs
+    ) -> Optional[httpx.Response]:
+        sub_provider = await self._get_sub_provider(request, model)
+        start = time.time()
+
+        try:
+            response = await self.client.post(
+                url=f'{self.api_config.api_base_url}{path}',
+                headers={'Authorization': f'Bearer {sub_provider["api_key"]}', **(headers or {})},
+                **kwargs
+            )
+        except httpx.HTTPError as e:
+            await self._handle_upstream_error(request, model, sub_provider, start, 500, str(e))
+            return None
+        finally:
+            self._release_sub_provider(sub_provider)
+
+        if response.is_error:
+            await self._handle_upstream_error(request, model, sub_provider, start, response.status_code)
+            return None
+
+        elapsed = time.time() - start
+        self._record_outcome(sub_provider, True, start, response.status_code)
+        self._record_latency(request, sub_provider, 'total', elapsed)
+        return response
 
     @classmethod
-    @ErrorHandler.retry_provider(max_retries=3)
     async def chat_completions(
         cls,
         request: Request,
@@ -105,14 +231,12 @@ class OpenAI(BaseProvider):
     ) -> Union[JSONResponse, StreamingResponseWithStatusCode]:
         instance = cls()
 
-        sub_provider = await instance._get_sub_provider(model)
+        sub_provider = await instance._get_sub_provider(request, model)
         model = next((m['provider_name'] for m in sub_provider['models'] if m['api_name'] == model), None)
         start = time.time()
+        release = True
 
         try:
-            request.state.user['credits'] -= request.state.token_count
-            await user_manager.update_user(request.state.user['user_id'], request.state.user)
-
             if not stream:
                 return await instance._handle_non_streaming_chat(
                     request=request,
@@ -122,7 +246,8 @@ class OpenAI(BaseProvider):
                     start=start,
                     **kwargs
                 )
-            return await instance._handle_streaming_chat(
+
+            response = await instance._handle_streaming_chat(
                 request=request,
                 model=model,
                 messages=messages,
@@ -130,10 +255,14 @@ class OpenAI(BaseProvider):
                 start=start,
                 **kwargs
             )
+            release = not isinstance(response, StreamingResponseWithStatusCode)
+            return response
         except httpx.HTTPError as e:
-            await WebhookManager.send_to_webhook(request, True, model, instance.api_config.provider_id, str(e))
-            await instance._handle_error(request, model, 500)
+            await instance._handle_upstream_error(request, model, sub_provider, start, 500, str(e))
             return instance._generate_error_response()
+        finally:
+            if release:
+                instance._release_sub_provider(sub_provider)
 
     @classmethod
     async def images_generations(
@@ -148,29 +277,23 @@ class OpenAI(BaseProvider):
         if 'negative_prompt' in kwargs:
             del kwargs['negative_prompt']
 
-        async with httpx.AsyncClient() as client:
-            sub_provider = await instance._get_sub_provider(model)
-            response = await client.post(
-                url=f'{instance.api_config.api_base_url}/images/generations',
-                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                json={'model': model, 'prompt': prompt, **kwargs},
-                timeout=10000
-            )
+        response = await instance._request(
+            request,
+            model,
+            '/images/generations',
+            json={'model': model, 'prompt': prompt, **kwargs},
+            timeout=10000
+        )
 
-            if response.status_code >= 400:
-                if response.status_code in [401, 403, 429]:
-                    await instance._disable_sub_provider(sub_provider['api_key'])
-                await instance._handle_error(request, model, response.status_code)
-                return instance._generate_error_response()
+        if response is None:
+            return instance._generate_error_response()
 
-            token_count = instance.config.model_prices.get(model, 10)
-            request.state.user['credits'] -= token_count
-            await user_manager.update_user(request.state.user['user_id'], request.state.user)
+        instance._update_user_credits(request, instance.config.model_prices.get(model, 10))
 
-            return JSONResponse({
-                'provider_id': instance.api_config.provider_id,
-                **response.json()
-            })
+        return JSONResponse({
+            'provider_id': instance.api_config.provider_id,
+            **response.json()
+        })
 
     @classmethod
     async def embeddings(
@@ -181,28 +304,31 @@ class OpenAI(BaseProvider):
         **kwargs
     ) -> JSONResponse:
         instance = cls()
+        lookup = embeddings_cache.lookup(model, embeddings_cache.split_input(input), kwargs)
+        misses = lookup.misses
 
-        async with httpx.AsyncClient() as client:
-            sub_provider = await instance._get_sub_provider(model)
-            response = await client.post(
-                url=f'{instance.api_config.api_base_url}/embeddings',
-                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                json={'model': model, 'input': input, **kwargs}
-            )
+        usage = None
 
-            if response.status_code >= 400:
-                if response.status_code in [401, 403, 429]:
-                    await instance._disable_sub_provider(sub_provider['api_key'])
-                await instance._handle_error(request, model, response.status_code)
+        if misses:
+            items = [lookup.items[index] for index in misses]
+            data, usage = await instance._create_embeddings(request, model, items, kwargs)
+
+            if data is None:
                 return instance._generate_error_response()
 
-            request.state.user['credits'] -= 100
-            await user_manager.update_user(request.state.user['user_id'], request.state.user)
+            for index, item, tokens in zip(misses, data, instance._count_embedding_tokens(items)):
+                embeddings_cache.store(lookup, index, {'embedding': item['embedding'], 'tokens': tokens})
+
+            instance._update_user_credits(request, 100)
 
-            return JSONResponse({
-                'provider_id': instance.api_config.provider_id,
-                **response.json()
-            })
+        # Upstream usage is only exact when every item went upstream in this request's own call.
+        if len(misses) < len(lookup.items):
+            usage = None
+
+        return JSONResponse({
+            'provider_id': instance.api_config.provider_id,
+            **embeddings_cache.build_response(lookup, usage)
+        })
 
     @classmethod
     async def moderations(
@@ -212,28 +338,32 @@ class OpenAI(BaseProvider):
         input: Union[str, List[str]]
     ) -> JSONResponse:
         instance = cls()
-
-        async with httpx.AsyncClient() as client:
-            sub_provider = await instance._get_sub_provider(model)
-            response = await client.post(
-                url=f'{instance.api_config.api_base_url}/moderations',
-                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                json={'model': model, 'input': input}
+        lookup = moderations_cache.lookup(model, moderations_cache.split_input(input), {})
+        misses = lookup.misses
+        response_id = None
+
+        if misses:
+            response = await instance._request(
+                request,
+                model,
+                '/moderations',
+                json={'model': model, 'input': [lookup.items[index] for index in misses]}
             )
 
-            if response.status_code >= 400:
-                if response.status_code in [401, 403, 429]:
-                    await instance._disable_sub_provider(sub_provider['api_key'])
-                await instance._handle_error(request, model, response.status_code)
+            if response is None:
                 return instance._generate_error_response()
 
-            request.state.user['credits'] -= 10
-            await user_manager.update_user(request.state.user['user_id'], request.state.user)
+            json_response = response.json()
+            response_id = json_response.get('id')
+            for index, result in zip(misses, json_response['results']):
+                moderations_cache.store(lookup, index, result)
+
+            instance._update_user_credits(request, 10)
 
-            return JSONResponse({
-                'provider_id': instance.api_config.provider_id,
-                **response.json()
-            })
+        return JSONResponse({
+            'provider_id': instance.api_config.provider_id,
+            **moderations_cache.build_response(lookup, response_id)
+        })
 
     @classmethod
     async def audio_speech(
@@ -241,94 +371,155 @@ class OpenAI(BaseProvider):
         request: Request,
         model: str,
         input: str,
+        response_format: str = 'mp3',
         **kwargs
-    ) -> Response:
+    ) -> Union[JSONResponse, StreamingResponseWithStatusCode]:
         instance = cls()
 
-        async with httpx.AsyncClient() as client:
-            sub_provider = await instance._get_sub_provider(model)
-            response = await client.post(
-                url=f'{instance.api_config.api_base_url}/audio/speech',
-                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                json={'model': model, 'input': input, **kwargs}
+        sub_provider = await instance._get_sub_provider(request, model)
+        start = time.time()
+        release = True
+
+        try:
+            response = await instance.client.send(
+                instance.client.build_request(
+                    method='POST',
+                    url=f'{instance.api_config.api_base_url}/audio/speech',
+                    headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
+                    json={
+                        'model': model,
+                        'input': input,
+                        'response_format': response_format,
+                        **{key: value for key, value in kwargs.items() if value is not None}
+                    }
+                ),
+                stream=True
             )
 
-            if response.status_code >= 400:
-                if response.status_code in [401, 403, 429]:
-                    await instance._disable_sub_provider(sub_provider['api_key'])
-                await instance._handle_error(request, model, response.status_code)
+            if response.is_error:
+                await response.aclose()
+                await instance._handle_upstream_error(request, model, sub_provider, start, response.status_code)
                 return instance._generate_error_response()
 
-            request.state.user['credits'] -= instance.config.model_prices.get(model, 10)
-            await user_manager.update_user(request.state.user['user_id'], request.state.user)
+            metrics.upstream_responses.inc(instance.config.name, str(response.status_code))
+            release = False
+
+            return instance._stream_speech(request, model, sub_provider, response, start, response_format)
+        except httpx.HTTPError as e:
+            await instance._handle_upstream_error(request, model, sub_provider, start, 500, str(e))
+            return instance._generate_error_response()
+        finally:
+            if release:
+                instance._release_sub_provider(sub_provider)
 
-            return Response(
-                content=response.content,
-                media_type='audio/mpeg',
-                headers={'Content-Disposition': 'attachment;filename=audio.mp3'}
+    def _stream_speech(
+        self,
+        request: Request,
+        model: str,
+        sub_provider: Dict[str, Any],
+        response: httpx.Response,
+        start: float,
+        response_format: str
+    ) -> StreamingResponseWithStatusCode:
+        ttft: Optional[float] = None
+        failed = False
+        closed = False
+
+        def close() -> None:
+            nonlocal closed
+            if closed:
+                return
+            closed = True
+
+            circuit_breakers.key(sub_provider['api_key']).record(
+                not failed,
+                ttft if ttft is not None else time.time() - start
             )
-    
+            self._release_sub_provider(sub_provider)
+            metrics.active_streams.dec(self.config.name)
+            if ttft is not None:
+                self._update_user_credits(request, self.config.model_prices.get(model, 10))
+            self._close_stream(request, response)
+
+        async def stream_audio() -> AsyncGenerator[Tuple[Union[str, bytes], int], None]:
+            nonlocal ttft, failed
+            try:
+                async for chunk in response.aiter_bytes(self.api_config.speech_chunk_size):
+                    if ttft is None:
+                        ttft = time.time() - start
+                        self._record_latency(request, sub_provider, 'ttft', ttft)
+                    yield chunk, 200
+
+                if ttft is None:
+                    yield ResponseGenerator.generate_error('Empty audio response', self.api_config.provider_id), 500
+                    return
+
+                self._record_latency(request, sub_provider, 'total', time.time() - start)
+            except httpx.HTTPError:
+                failed = True
+                await self._handle_error(request, model, 500)
+                if ttft is None:
+                    yield ResponseGenerator.generate_error('Stream interrupted', self.api_config.provider_id), 500
+            finally:
+                close()
+
+        metrics.active_streams.inc(self.config.name)
+        return StreamingResponseWithStatusCode(
+            content=stream_audio(),
+            media_type=self.api_config.speech_media_types[response_format],
+            headers={'Content-Disposition': f'attachment;filename=audio.{response_format}'},
+            on_close=close
+        )
+
     @classmethod
     async def audio_transcriptions(
         cls,
         request: Request,
         model: str,
-        file: UploadFile
-    ) -> JSONResponse:
+        content: AsyncIterator[bytes],
+        headers: Dict[str, str]
+    ) -> Response:
         instance = cls()
 
-        async with httpx.AsyncClient() as client:
-            sub_provider = await instance._get_sub_provider(model)
-            response = await client.post(
-                url=f'{instance.api_config.api_base_url}/audio/transcriptions',
-                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                files={'model': (None, model), 'file': (file.filename, file.file)}
-            )
+        response = await instance._request(
+            request,
+            model,
+            '/audio/transcriptions',
+            content=content,
+            headers=headers
+        )
 
-            if response.is_error:
-                if response.status_code in [401, 403, 429]:
-                    await instance._disable_sub_provider(sub_provider['api_key'])
-                await instance._handle_error(request, model, response.status_code)
-                return instance._generate_error_response()
+        if response is None:
+            return instance._generate_error_response()
 
-            request.state.user['credits'] -= 100
-            await user_manager.update_user(request.state.user['user_id'], request.state.user)
+        instance._update_user_credits(request, 100)
 
-            return JSONResponse({
-                'provider_id': instance.api_config.provider_id,
-                **response.json()
-            })
+        return instance._build_transcript_response(response)
     
     @classmethod
     async def audio_translations(
         cls,
         request: Request,
         model: str,
-        file: UploadFile
-    ) -> JSONResponse:
+        content: AsyncIterator[bytes],
+        headers: Dict[str, str]
+    ) -> Response:
         instance = cls()
 
-        async with httpx.AsyncClient() as client:
-            sub_provider = await instance._get_sub_provider(model)
-            response = await client.post(
-                url=f'{instance.api_config.api_base_url}/audio/translations',
-                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                files={'model': (None, model), 'file': (file.filename, file.file)}
-            )
+        response = await instance._request(
+            request,
+            model,
+            '/audio/translations',
+            content=content,
+            headers=headers
+        )
 
-            if response.status_code >= 400:
-                if response.status_code in [401, 403, 429]:
-                    await instance._disable_sub_provider(sub_provider['api_key'])
-                await instance._handle_error(request, model, response.status_code)
-                return instance._generate_error_response()
+        if response is None:
+            return instance._generate_error_response()
 
-            request.state.user['credits'] -= 100
-            await user_manager.update_user(request.state.user['user_id'], request.state.user)
+        instance._update_user_credits(request, 100)
 
-            return JSONResponse({
-                'provider_id': instance.api_config.provider_id,
-                **response.json()
-            })
+        return instance._build_transcript_response(response)
 
     async def _handle_non_streaming_chat(
         self,
@@ -339,29 +530,27 @@ class OpenAI(BaseProvider):
         start: float,
         **kwargs
     ) -> JSONResponse:
-        async with httpx.AsyncClient(verify=False, timeout=self.api_config.timeout) as client:
-            response = await client.post(
-                url=f'{self.api_config.api_base_url}/chat/completions',
-                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                json={
-                    'model': model,
-                    'messages': messages,
-                    'stream': False,
-                    **kwargs
-                }
-            )
+        response = await self.client.post(
+            url=f'{self.api_config.api_base_url}/chat/completions',
+            headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
+            json={
+                'model': model,
+                'messages': messages,
+                'stream': False,
+                **kwargs
+            }
+        )
             
-            if response.status_code >= 400:
-                if response.status_code in [401, 403, 429]:
-                    await self._disable_sub_provider(sub_provider['api_key'])
-                await self._handle_error(request, model, response.status_code)
-                return self._generate_error_response()
-
-            await self._update_metrics(request, sub_provider, response, start)
-            return JSONResponse({
-                'provider_id': self.api_config.provider_id,
-                **response.json()
-            })
+        if response.status_code >= 400:
+            await self._handle_upstream_error(request, model, sub_provider, start, response.status_code)
+            return self._generate_error_response()
+
+        self._record_outcome(sub_provider, True, start, response.status_code)
+        await self._update_metrics(request, sub_provider, response, start)
+        return JSONResponse({
+            'provider_id': self.api_config.provider_id,
+            **response.json()
+        })
 
     async def _handle_streaming_chat(
         self,
@@ -371,44 +560,98 @@ class OpenAI(BaseProvider):
         sub_provider: Dict[str, Any],
         start: float,
         **kwargs
-    ) -> StreamingResponseWithStatusCode:
-        async def stream_response() -> AsyncGenerator[Tuple[str, int], None]:
-            success = True
+    ) -> Union[JSONResponse, StreamingResponseWithStatusCode]:
+        if self.api_config.stream_usage:
+            kwargs['stream_options'] = {'include_usage': True}
+
+        response = await self.client.send(
+            self.client.build_request(
+                method='POST',
+                url=f'{self.api_config.api_base_url}/chat/completions',
+                headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
+                json={
+                    'model': model,
+                    'messages': messages,
+                    'stream': True,
+                    **kwargs
+                }
+            ),
+            stream=True
+        )
+
+        if response.status_code >= 400:
+            await response.aclose()
+            await self._handle_upstream_error(request, model, sub_provider, start, response.status_code)
+            return self._generate_error_response()
+
+        metrics.upstream_responses.inc(self.config.name, str(response.status_code))
+        await self._update_streaming_metrics(request, sub_provider)
+        self._update_user_credits(request, request.state.token_count)
+
+        accountant = request_processor.create_stream_accountant()
+        ttft: Optional[float] = None
+        failed = False
+        closed = False
+
+        def close() -> None:
+            nonlocal closed
+            if closed:
+                return
+            closed = True
+
+            # One breaker sample per stream, timed to the first token so long completions don't count as slow.
+            circuit_breakers.key(sub_provider['api_key']).record(
+                not failed,
+                ttft if ttft is not None else time.time() - start
+            )
+            self._release_sub_provider(sub_provider)
+            token_count = accountant.finalize()
+            metrics.active_streams.dec(self.config.name)
+            metrics.streamed_tokens.inc(self.config.name, value=token_count)
+            self._update_user_credits(request, token_count)
+            self._close_stream(request, response)
+
+        async def stream_response() -> AsyncGenerator[Tuple[Union[str, bytes], int], None]:
+            nonlocal ttft, failed
+            passthrough = SSEPassthrough(self.api_config.provider_id)
             try:
-                async with httpx.AsyncClient(verify=False, timeout=self.api_config.timeout) as client:
-                    async with client.stream(
-                        method='POST',
-                        url=f'{self.api_config.api_base_url}/chat/completions',
-                        headers={'Authorization': f'Bearer {sub_provider["api_key"]}'},
-                        json={
-                            'model': model,
-                            'messages': messages,
-                            'stream': True,
-                            **kwargs
-                        }
-                    ) as response:
-                        if response.status_code >= 400:
-                            if response.status_code in [401, 403, 429]:
-                                await self._disable_sub_provider(sub_provider['api_key'])
-                            success = False
-                            await self._handle_error(request, model, response.status_code)
-                            yield ResponseGenerator.generate_error('An error occurred. Try again later.', self.api_config.provider_id), 500
-                        else:
-                            await self._update_streaming_metrics(request, sub_provider, start)
-                            
-                            async for line in response.aiter_lines():
-                                if line.startswith('data: ') and not line.startswith('data: [DONE]'):
-                                    yield await self._process_stream_chunk(request, line)
-
-                        if success:
-                            yield 'data: [DONE]\n\n', 200
+                async for line in SSEPassthrough.iter_lines(response.aiter_bytes()):
+                    payload = passthrough.get_payload(line)
+                    if payload and accountant.add_payload(payload):
+                        if ttft is None:
+                            ttft = time.time() - start
+                            self._record_latency(request, sub_provider, 'ttft', ttft)
+                        yield passthrough.splice(payload), 200
+
+                self._record_latency(request, sub_provider, 'total', time.time() - start)
+                yield 'data: [DONE]\n\n', 200
             except httpx.HTTPError:
+                failed = True
                 await self._handle_error(request, model, 500)
                 yield ResponseGenerator.generate_error('Stream interrupted', self.api_config.provider_id), 500
+            finally:
+                close()
 
+        metrics.active_streams.inc(self.config.name)
         return StreamingResponseWithStatusCode(
             content=stream_response(),
-            media_type='text/event-stream'
+            media_type='text/event-stream',
+            on_close=close
+        )
+
+    def _record_latency(
+        self,
+        request: Request,
+        sub_provider: Dict[str, Any],
+        metric: str,
+        value: float
+    ) -> None:
+        latency_tracker.record(
+            metric,
+            value,
+            provider=self.config.name,
+            model=getattr(request.state, 'model', None),
+            api_key=sub_provider['api_key']
         )
 
     async def _update_metrics(
@@ -420,73 +663,85 @@ class OpenAI(BaseProvider):
     ) -> None:
         elapsed = time.time() - start
         json_response = response.json()
-        
-        word_count = sum(
-            len(choice['message']['content'])
-            for choice in json_response['choices']
-            if choice['message']['content']
-        )
-        token_count = sum(
-            request_processor.count_tokens(choice['message']['content'])
-            for choice in json_response['choices']
-            if choice['message']['content']
-        )
 
-        latency_avg = (elapsed / word_count) if elapsed > 0 else 0
-
-        request.state.provider['usage'] += 1
-        request.state.provider['latency_avg'] = (
-            (request.state.provider['latency_avg'] + latency_avg) / 2 
-            if request.state.provider['latency_avg'] != 0 
-            else latency_avg
-        )
-
-        sub_provider['usage'] = sub_provider.get('usage', 0) + 1
-        sub_provider['last_usage'] = time.time()
+        token_count = (json_response.get('usage') or {}).get('completion_tokens')
+        if token_count is None:
+            token_count = sum(
+                request_processor.count_tokens(choice['message']['content'])
+                for choice in json_response['choices']
+                if choice['message']['content']
+            )
 
-        await provider_manager.update_provider(self.config.name, request.state.provider)
-        await self._update_sub_provider(sub_provider['api_key'], sub_provider)
-        await self._update_user_credits(request, request.state.token_count + token_count)
+        self._record_latency(request, sub_provider, 'total', elapsed)
+        await provider_manager.record_usage(self.config.name)
+        await sub_provider_manager.record_usage(sub_provider['api_key'])
+        self._update_user_credits(request, request.state.token_count + token_count)
 
     async def _update_streaming_metrics(
         self,
         request: Request,
-        sub_provider: Dict[str, Any],
-        start: float
+        sub_provider: Dict[str, Any]
     ) -> None:
-        elapsed = time.time() - start
-
-        request.state.provider['usage'] += 1
-        request.state.provider['latency_avg'] = (
-            (request.state.provider['latency_avg'] + elapsed) / 2 
-            if request.state.provider['latency_avg'] != 0 
-            else elapsed
-        )
+        await provider_manager.record_usage(self.config.name)
+        await sub_provider_manager.record_usage(sub_provider['api_key'])
 
-        sub_provider['usage'] = sub_provider.get('usage', 0) + 1
-        sub_provider['last_usage'] = time.time()
-
-        await provider_manager.update_provider(self.config.name, request.state.provider)
-        await self._update_sub_provider(sub_provider['api_key'], sub_provider)
-
-    async def _process_stream_chunk(
+    async def _create_embeddings(
         self,
         request: Request,
-        line: str
-    ) -> Tuple[str, int]:
-        parsed_chunk = {
-            'provider_id': self.api_config.provider_id,
-            **ujson.loads(line[6:].strip())
-        }
-        token_count = sum(
-            request_processor.count_tokens(choice['delta'].get('content', ''))
-            for choice in parsed_chunk['choices']
-        )
+        model: str,
+        items: List[Any],
+        params: Dict[str, Any]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+        async def send(context: Request, batch_items: List[Any]) -> Optional[Dict[str, Any]]:
+            response = await self._request(
+                context,
+                model,
+                '/embeddings',
+                json={'model': model, 'input': batch_items, **params}
+            )
+            return response.json() if response is not None else None
 
-        await self._update_user_credits(request, token_count)
+        def sort_data(json_response: Dict[str, Any]) -> List[Dict[str, Any]]:
+            return sorted(json_response['data'], key=lambda item: item['index'])
 
-        return f'data: {ujson.dumps(parsed_chunk)}\n\n', 200
+        if not embeddings_batcher.enabled:
+            json_response = await send(request, items)
+            if json_response is None:
+                return None, None
+            return sort_data(json_response), json_response.get('usage')
 
-    async def _update_user_credits(self, request: Request, token_count: int) -> None:
+        async def send_batch(batch_items: List[Any], requests: List[Request]) -> Optional[List[Dict[str, Any]]]:
+            context = self._create_batch_context(requests)
+
+            try:
+                json_response = await send(context, batch_items)
+            finally:
+                # Every waiter's failover retry has to skip the keys that failed for the shared call.
+                for waiter in requests:
+                    self._get_excluded_sub_providers(waiter).update(context.state.excluded_sub_providers)
+
+            return sort_data(json_response) if json_response is not None else None
+
+        # A coalesced call's usage covers other requests' inputs too, so none is passed through.
+        key = (self.config.name, model, tuple(sorted(params.items())))
+        return await embeddings_batcher.submit(key, items, send_batch, request), None
+
+    def _create_batch_context(self, requests: List[Request]) -> SimpleNamespace:
+        user_ids = dict.fromkeys(str(waiter.state.user['user_id']) for waiter in requests)
+        excluded = set().union(*(self._get_excluded_sub_providers(waiter) for waiter in requests))
+
+        return SimpleNamespace(state=SimpleNamespace(
+            user={'user_id': ', '.join(user_ids)},
+            model=getattr(requests[0].state, 'model', None),
+            excluded_sub_providers=excluded
+        ))
+
+    @staticmethod
+    def _count_embedding_tokens(items: List[Any]) -> List[int]:
+        texts = [item for item in items if isinstance(item, str)]
+        counts = iter(request_processor.embeddings_token_counter.count_texts(texts) if texts else [])
+        return [next(counts) if isinstance(item, str) else len(item) for item in items]
+
+    def _update_user_credits(self, request: Request, token_count: int) -> None:
         request.state.user['credits'] -= token_count
-        await user_manager.update_user(request.state.user['user_id'], request.state.user)
\ No newline at end of file
+        user_manager.deduct_credits(request.state.user['user_id'], token_count)
\ No newline at end of file
@@ -1,13 +1,15 @@
 import time
 import ujson
+import asyncio
 import random
 import string
-import functools
 import httpx
 from dataclasses import dataclass
-from fastapi import Request, Response
-from typing import List, Dict, Any, Callable, Coroutine, Optional
-from ..core import settings
+from urllib.parse import urlsplit
+from fastapi import Request
+from typing import List, Dict, Any, Tuple, Optional, AsyncIterator, AsyncGenerator
+from ..core import settings, http_client_manager
+from ..responses import JSONRenderer
 
 @dataclass
 class WebhookConfig:
@@ -15,23 +17,17 @@ class WebhookConfig:
     error_color: int = 0xFF0000
     admin_id: str = '325699845031723010'
     error_alert: str = '⚠️ **Error Alert**'
+    queue_size: int = 1000
+    batch_size: int = 10
+    dedup_window: float = 60.0
+    sweep_interval: float = 1.0
+    max_retries: int = 3
+    drain_timeout: float = 5.0
 
-class ErrorHandler:
-    @staticmethod
-    def retry_provider(max_retries: int) -> Callable[..., Callable]:
-        def wrapper(
-            func: Callable[..., Coroutine[Any, Any, Response]]
-        ) -> Callable[..., Coroutine[Any, Any, Any]]:
-            @functools.wraps(func)
-            async def inner(*args, **kwargs) -> Any:
-                for attempt in range(max_retries):
-                    response = await func(*args, **kwargs)
-
-                    if response.status_code == 200 or attempt == max_retries - 1:
-                        return response
-
-            return inner
-        return wrapper
+class ProviderUnavailableError(Exception):
+    def __init__(self, provider: str, model: str):
+        self.message = f'{provider} has no sub-provider available for {model}.'
+        super().__init__(self.message)
 
 class MessageFormatter:
     @staticmethod
@@ -92,23 +88,43 @@ class ResponseGenerator:
         return ResponseGenerator._serialize_json(chunk_response, False)
 
     @staticmethod
-    def _serialize_json(obj: Dict[str, Any], indented: bool = True) -> str:
-        if indented:
-            return ujson.dumps(
-                obj=obj,
-                ensure_ascii=False,
-                allow_nan=False,
-                indent=4,
-                separators=(', ', ': '),
-                escape_forward_slashes=False
-            )
-
-        return ujson.dumps(
-            obj=obj,
-            ensure_ascii=False,
-            allow_nan=False,
-            escape_forward_slashes=False
-        )
+    def _serialize_json(obj: Dict[str, Any], indented: bool = False) -> str:
+        return JSONRenderer.render(obj, pretty=indented).decode('utf-8')
+
+class SSEPassthrough:
+    DATA_PREFIX = b'data: '
+    DONE_MARKER = b'[DONE]'
+
+    def __init__(self, provider_id: str):
+        self.provider_field = b'"provider_id":' + ujson.dumps(provider_id).encode('utf-8')
+
+    @staticmethod
+    async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncGenerator[bytes, None]:
+        buffer = b''
+
+        async for chunk in chunks:
+            buffer += chunk
+            *lines, buffer = buffer.split(b'\n')
+
+            for line in lines:
+                yield line.rstrip(b'\r')
+
+        if buffer:
+            yield buffer.rstrip(b'\r')
+
+    def get_payload(self, line: bytes) -> Optional[bytes]:
+        if not line.startswith(self.DATA_PREFIX):
+            return None
+
+        payload = line[len(self.DATA_PREFIX):].strip()
+        if not payload.startswith(b'{'):
+            return None
+        return payload
+
+    def splice(self, payload: bytes) -> bytes:
+        rest = payload[1:].lstrip()
+        separator = b'' if rest.startswith(b'}') else b','
+        return b''.join((b'data: {', self.provider_field, separator, rest, b'\n\n'))
 
 class IDGenerator:
     COMPLETION_PREFIX = 'chatcmpl-AXb'
@@ -126,6 +142,209 @@ class IDGenerator:
     def generate_fingerprint(cls) -> str:
         return f'{cls.FINGERPRINT_PREFIX}{cls.generate_random_string(10, string.hexdigits.lower())}'
 
+class WebhookDispatcher:
+    def __init__(self, config: Optional[WebhookConfig] = None):
+        self.config = config or WebhookConfig()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=self.config.queue_size)
+        self.windows: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        self.task: Optional[asyncio.Task] = None
+        self.stopping = False
+        self.resume_at = 0.0
+        self.sent = 0
+        self.suppressed = 0
+        self.dropped = 0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Keyed by origin only: the webhook path carries its token and client keys show up in pool stats.
+        url = urlsplit(settings.webhook_url)
+        return http_client_manager.get(f'{url.scheme}://{url.hostname}' + (f':{url.port}' if url.port else ''))
+
+    def _put(self, window: Dict[str, Any]) -> bool:
+        try:
+            self.queue.put_nowait(window)
+            window['queued'] = True
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    def enqueue(
+        self,
+        dedup_key: Tuple[Any, ...],
+        is_error: bool,
+        embed: Dict[str, Any]
+    ) -> None:
+        window = self.windows.get(dedup_key)
+
+        if window and time.time() < window['expires']:
+            window['count'] += 1
+            self.suppressed += 1
+            return
+
+        window = {
+            'is_error': is_error,
+            'embed': embed,
+            'count': 1,
+            'queued': False,
+            'expires': time.time() + self.config.dedup_window
+        }
+
+        if self._put(window):
+            self.windows[dedup_key] = window
+
+    def _sweep(self) -> None:
+        now = time.time()
+
+        for dedup_key, window in list(self.windows.items()):
+            if now < window['expires']:
+                continue
+
+            if window['queued'] or not window['count'] or not self._put(window):
+                del self.windows[dedup_key]
+            else:
+                window['expires'] = now + self.config.dedup_window
+
+    def _create_payload(self, batch: List[Dict[str, Any]]) -> Dict[str, Any]:
+        embeds = []
+
+        for window in batch:
+            embed = window['embed']
+            if window['count'] > 1:
+                embed = {
+                    **embed,
+                    'fields': [
+                        *embed['fields'],
+                        {'name': 'Occurrences', 'value': str(window['count']), 'inline': True}
+                    ]
+                }
+            window['count'] = 0
+            window['queued'] = False
+            embeds.append(embed)
+
+        payload = {'embeds': embeds}
+
+        if any(window['is_error'] for window in batch):
+            payload['content'] = f'{self.config.error_alert} <@{self.config.admin_id}>: WAKE THE FUCK UP'
+
+        return payload
+
+    @staticmethod
+    def _get_retry_after(response: httpx.Response) -> float:
+        try:
+            return float(response.json().get('retry_after', 1))
+        except Exception:
+            return float(response.headers.get('Retry-After', 1))
+
+    def _update_rate_limit(self, response: httpx.Response) -> None:
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            reset_after = float(response.headers.get('X-RateLimit-Reset-After', 1))
+            self.resume_at = max(self.resume_at, time.time() + reset_after)
+
+    async def _send(self, batch: List[Dict[str, Any]]) -> None:
+        payload = self._create_payload(batch)
+
+        for _ in range(self.config.max_retries):
+            try:
+                await asyncio.sleep(max(0.0, self.resume_at - time.time()))
+                response = await self.client.post(settings.webhook_url, json=payload)
+            except httpx.HTTPError:
+                await asyncio.sleep(1)
+                continue
+            except asyncio.CancelledError:
+                self.dropped += len(batch)
+                raise
+
+            self._update_rate_limit(response)
+
+            if response.status_code == 429:
+                self.resume_at = time.time() + self._get_retry_after(response)
+                continue
+
+            self.sent += len(batch)
+            return
+
+        self.dropped += len(batch)
+
+    async def _next_batch(self, timeout: float) -> List[Dict[str, Any]]:
+        try:
+            batch = [await asyncio.wait_for(self.queue.get(), timeout)]
+        except asyncio.TimeoutError:
+            return []
+
+        while len(batch) < self.config.batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+        return batch
+
+    async def _run(self) -> None:
+        while not self.stopping:
+            try:
+                batch = await self._next_batch(self.config.sweep_interval)
+                if batch:
+                    await self._send(batch)
+                self._sweep()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                print(f'Webhook dispatcher error: {str(e)}')
+
+    async def _drain(self) -> None:
+        for window in self.windows.values():
+            if window['count'] and not window['queued']:
+                self._put(window)
+        self.windows.clear()
+
+        while not self.queue.empty():
+            batch = [
+                self.queue.get_nowait()
+                for _ in range(min(self.config.batch_size, self.queue.qsize()))
+            ]
+            await self._send(batch)
+
+    async def start(self) -> None:
+        if not self.task or self.task.done():
+            self.stopping = False
+            self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.config.drain_timeout
+        self.stopping = True
+
+        if self.task and not self.task.done():
+            try:
+                # Let the worker finish the batch it is sending instead of cutting it off mid-request.
+                await asyncio.wait_for(asyncio.shield(self.task), self.config.drain_timeout)
+            except asyncio.TimeoutError:
+                self.task.cancel()
+                try:
+                    await self.task
+                except asyncio.CancelledError:
+                    pass
+
+        try:
+            await asyncio.wait_for(self._drain(), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            remaining = self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+
+            self.dropped += remaining
+            print(f'Webhook queue not drained within {self.config.drain_timeout}s, dropped {remaining} notifications')
+        except Exception as e:
+            print(f'Failed to drain webhook queue: {str(e)}')
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            'queued': self.queue.qsize(),
+            'sent': self.sent,
+            'suppressed': self.suppressed,
+            'dropped': self.dropped
+        }
+
+webhook_dispatcher = WebhookDispatcher()
+
 class WebhookManager:
     def __init__(self):
         self.config = WebhookConfig()
@@ -173,18 +392,6 @@ class WebhookManager:
             }
         }
 
-    def _create_payload(
-        self,
-        is_error: bool,
-        embed_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        payload = {'embeds': [embed_data]}
-        
-        if is_error:
-            payload['content'] = f'{self.config.error_alert} <@{self.config.admin_id}>: WAKE THE FUCK UP'
-        
-        return payload
-
     @classmethod
     async def send_to_webhook(
         cls,
@@ -204,7 +411,4 @@ class WebhookManager:
             exception=exception
         )
         
-        payload = instance._create_payload(is_error, embed_data)
-
-        async with httpx.AsyncClient() as client:
-            await client.post(settings.webhook_url, json=payload)
\ No newline at end of file
+        webhook_dispatcher.enqueue((is_error, model, pid, exception), is_error, embed_data)
\ No newline at end of file
@@ -1,8 +1,14 @@
 import ujson
+import asyncio
 from dataclasses import dataclass
 from fastapi.responses import StreamingResponse, Response
 from starlette.types import Send, Scope, Receive
-from typing import Union, Dict, Any, Tuple, AsyncGenerator, Optional
+from typing import Union, Dict, Any, Tuple, AsyncGenerator, Optional, Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 @dataclass
 class ResponseConfig:
@@ -10,6 +16,37 @@ class ResponseConfig:
     content_type: bytes = b'content-type'
     json_content_type: bytes = b'application/json'
     success_status_range: range = range(200, 300)
+    flush_interval: float = 0.01
+    max_buffer_size: int = 16384
+    pretty_query_values: Tuple[bytes, ...] = (b'pretty', b'pretty=1', b'pretty=true')
+    pretty_header: bytes = b'x-pretty-print'
+    pretty_header_values: Tuple[bytes, ...] = (b'1', b'true')
+
+class JSONRenderer:
+    @staticmethod
+    def render(content: Any, pretty: bool = False) -> bytes:
+        if not pretty and orjson is not None:
+            try:
+                return orjson.dumps(content)
+            except TypeError:
+                pass
+
+        if pretty:
+            return ujson.dumps(
+                obj=content,
+                ensure_ascii=False,
+                allow_nan=False,
+                indent=4,
+                separators=(', ', ': '),
+                escape_forward_slashes=False
+            ).encode('utf-8')
+
+        return ujson.dumps(
+            obj=content,
+            ensure_ascii=False,
+            allow_nan=False,
+            escape_forward_slashes=False
+        ).encode('utf-8')
 
 class StreamResponseHandler:
     def __init__(self, config: ResponseConfig = ResponseConfig()):
@@ -73,6 +110,7 @@ class StreamingResponseWithStatusCode(StreamingResponse):
         headers: Optional[Dict[str, str]] = None,
         media_type: Optional[str] = None,
         background: Optional[Any] = None,
+        on_close: Optional[Callable[[], None]] = None
     ):
         super().__init__(
             content=content,
@@ -82,6 +120,29 @@ class StreamingResponseWithStatusCode(StreamingResponse):
             background=background
         )
         self.handler = StreamResponseHandler()
+        self.on_close = on_close
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Runs even if the body was never iterated, e.g. the client left before the first chunk.
+            if self.on_close is not None:
+                self.on_close()
+
+    async def _next_chunk(
+        self,
+        pending: Optional[asyncio.Future],
+        timeout: Optional[float]
+    ) -> Tuple[Optional[asyncio.Future], Optional[Tuple[Union[str, bytes], int]]]:
+        if pending is None and timeout is None:
+            return None, await self.body_iterator.__anext__()
+
+        if pending is None:
+            pending = asyncio.ensure_future(self.body_iterator.__anext__())
+
+        done, _ = await asyncio.wait({pending}, timeout=timeout)
+        return (None, pending.result()) if done else (pending, None)
 
     async def stream_response(self, send: Send) -> None:
         first_chunk_content, self.status_code = await self.body_iterator.__anext__()
@@ -99,32 +160,76 @@ class StreamingResponseWithStatusCode(StreamingResponse):
 
         await self.handler._send_chunk(send, first_chunk_content)
 
-        async for chunk_content, chunk_status in self.body_iterator:
-            if not self.handler._is_success_status(chunk_status):
-                self.status_code = chunk_status
-                await self.handler._send_chunk(send, '', False)
-                return
-
-            await self.handler._send_chunk(send, chunk_content)
+        config = self.handler.config
+        loop = asyncio.get_running_loop()
+        buffer = bytearray()
+        deadline = 0.0
+        pending: Optional[asyncio.Future] = None
+
+        try:
+            while True:
+                if buffer and (
+                    len(buffer) >= config.max_buffer_size or
+                    loop.time() >= deadline
+                ):
+                    await self.handler._send_chunk(send, bytes(buffer))
+                    buffer.clear()
+
+                try:
+                    pending, chunk = await self._next_chunk(
+                        pending,
+                        max(deadline - loop.time(), 0) if buffer else None
+                    )
+                except StopAsyncIteration:
+                    pending = None
+                    break
+
+                if chunk is None:
+                    continue
+
+                chunk_content, chunk_status = chunk
+
+                if not self.handler._is_success_status(chunk_status):
+                    self.status_code = chunk_status
+                    break
+
+                if not buffer:
+                    deadline = loop.time() + config.flush_interval
+                buffer += self.handler._encode_content(chunk_content)
+        finally:
+            if pending is not None and not pending.done():
+                pending.cancel()
+
+        if buffer:
+            await self.handler._send_chunk(send, bytes(buffer))
 
         await self.handler._send_chunk(send, '', False)
 
 class JSONResponse(Response):
     media_type = 'application/json'
-    
-    @staticmethod
-    def _serialize_json(content: Union[list, dict]) -> str:
-        return ujson.dumps(
-            obj=content,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=4,
-            separators=(', ', ': '),
-            escape_forward_slashes=False
-        )
+    config = ResponseConfig()
 
     def render(self, content: Union[list, dict]) -> bytes:
-        return self._serialize_json(content).encode('utf-8')
+        self.content = content
+        return JSONRenderer.render(content)
+
+    def _wants_pretty(self, scope: Scope) -> bool:
+        query_params = scope.get('query_string', b'').lower().split(b'&')
+        if any(param in self.config.pretty_query_values for param in query_params):
+            return True
+
+        return any(
+            key == self.config.pretty_header and
+            value.lower() in self.config.pretty_header_values
+            for key, value in scope.get('headers', [])
+        )
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._wants_pretty(scope):
+            self.body = JSONRenderer.render(self.content, pretty=True)
+            self.raw_headers = [
+                (key, value) for key, value in self.raw_headers
+                if key != b'content-length'
+            ] + [(b'content-length', str(len(self.body)).encode('latin-1'))]
+
         await super().__call__(scope, receive, send)
\ No newline at end of file
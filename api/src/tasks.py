@@ -3,9 +3,9 @@ import time
 import yaml
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
-from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
-from .core import settings
+from typing import Dict, Any, Optional, List, Tuple
+from motor.motor_asyncio import AsyncIOMotorCollection
+from .core import database, metrics
 
 @dataclass
 class CreditsConfig:
@@ -14,6 +14,12 @@ class CreditsConfig:
     daily_interval: int = 86400
     credits_file: str = 'credits.yml'
 
+@dataclass
+class RefillReport:
+    users_refilled: int = 0
+    operations: int = 0
+    duration: float = 0.0
+
 class CreditsManager:
     def __init__(
         self,
@@ -37,46 +43,60 @@ class CreditsManager:
         except Exception as e:
             raise RuntimeError(f'Failed to load credits configuration: {str(e)}')
 
-    async def _get_users_needing_update(self) -> AsyncIOMotorCollection:
-        current_time = time.time()
-        return self.db.find({
+    def _build_refill(
+        self,
+        tier: int,
+        amount: int,
+        current_time: float
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        query = {
+            'premium_tier': tier,
             'credits': {'$lt': self.config.max_credits},
             'last_daily': {
                 '$lte': current_time - self.config.daily_interval
             }
-        })
+        }
+        pipeline = [{
+            '$set': {
+                'credits': {
+                    '$min': [
+                        {'$add': ['$credits', amount]},
+                        self.config.max_credits
+                    ]
+                },
+                'last_daily': current_time
+            }
+        }]
+        return query, pipeline
 
-    async def _update_user_credits(self, user: Dict[str, Any]) -> None:
-        try:
-            credits_to_add = self.credits_tiers[user['premium_tier']]
-            current_time = time.time()
+    async def process_credits_updates(self) -> RefillReport:
+        start = time.time()
+        report = RefillReport()
 
-            await self.db.update_one(
-                {'user_id': user['user_id']},
-                {
-                    '$set': {
-                        'credits': min(
-                            user['credits'] + credits_to_add,
-                            self.config.max_credits
-                        ),
-                        'last_daily': current_time
-                    }
-                }
-            )
-        except Exception as e:
-            print(f'Failed to update credits for user {user["user_id"]}: {str(e)}')
+        for tier, amount in self.credits_tiers.items():
+            try:
+                query, pipeline = self._build_refill(tier, amount, start)
+                result = await self.db.update_many(query, pipeline)
+                report.users_refilled += result.modified_count
+                report.operations += 1
+            except Exception as e:
+                print(f'Failed to refill credits for tier {tier}: {str(e)}')
 
-    async def process_credits_updates(self) -> None:
-        try:
-            async for user in await self._get_users_needing_update():
-                await self._update_user_credits(user)
-        except Exception as e:
-            print(f'Error processing credits updates: {str(e)}')
+        report.duration = time.time() - start
+        return report
 
     async def start_credits_service(self) -> None:
         while True:
             try:
-                await self.process_credits_updates()
+                report = await self.process_credits_updates()
+                metrics.credits_refills.inc()
+                metrics.credits_refilled_users.inc(value=report.users_refilled)
+                metrics.credits_refill_duration.observe(report.duration)
+                if report.users_refilled:
+                    print(
+                        f'Refilled credits for {report.users_refilled} users '
+                        f'in {report.duration:.3f}s ({report.operations} operations)'
+                    )
                 await asyncio.sleep(self.config.check_interval)
             except asyncio.CancelledError:
                 break
@@ -86,12 +106,17 @@ class CreditsManager:
 
 class CreditsService:
     def __init__(self):
-        self.db = AsyncIOMotorClient(settings.db_url)['db']['users']
         self.config = CreditsConfig()
-        self.manager = CreditsManager(self.db, self.config)
+        self.manager: Optional[CreditsManager] = None
         self.task: Optional[asyncio.Task] = None
 
     async def start(self) -> None:
+        if not self.manager:
+            self.manager = CreditsManager(
+                database.get_collection('users'),
+                self.config
+            )
+
         if not self.task or self.task.done():
             self.task = asyncio.create_task(
                 self.manager.start_credits_service()
@@ -1,35 +1,126 @@
+import asyncio
+import hashlib
+import ujson
+import threading
 import tiktoken
+from collections import OrderedDict
 from fastapi import Request
-from typing import Union, List, Optional
-from dataclasses import dataclass
+from typing import Union, List, Optional, Dict, Any, Tuple
+from dataclasses import dataclass, replace
 from .models import ChatRequest, Message, TextContentPart, ImageContentPart
 
 @dataclass
 class TokenizerConfig:
     encoding_name: str = 'o200k_base'
+    embeddings_encoding_name: str = 'cl100k_base'
     non_text_token_count: int = 100
+    cache_size: int = 65536
+    offload_threshold: int = 32768
+    stream_buffer_limit: int = 1048576
+
+class TokenCountCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.entries: OrderedDict[bytes, int] = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def hash_text(text: str) -> bytes:
+        return hashlib.blake2b(
+            text.encode('utf-8', 'surrogatepass'),
+            digest_size=16
+        ).digest()
+
+    def get_many(self, keys: List[bytes]) -> List[Optional[int]]:
+        with self.lock:
+            counts = []
+
+            for key in keys:
+                count = self.entries.get(key)
+
+                if count is None:
+                    self.misses += 1
+                else:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+
+                counts.append(count)
+
+            return counts
+
+    def set_many(self, items: Dict[bytes, int]) -> None:
+        with self.lock:
+            self.entries.update(items)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses
+        }
 
 class TokenCounter:
     def __init__(self, config: Optional[TokenizerConfig] = None):
         self.config = config or TokenizerConfig()
         self.encoding = tiktoken.get_encoding(self.config.encoding_name)
+        self.cache = TokenCountCache(self.config.cache_size)
+
+    def _encode_lengths(self, texts: List[str]) -> List[int]:
+        # Sequential on purpose: encode_ordinary_batch spins up a new thread pool per call,
+        # which costs more than encoding the handful of misses a request usually has.
+        # Large payloads are already moved off the event loop by the caller.
+        return [len(self.encoding.encode_ordinary(text)) for text in texts]
+
+    def count_texts(self, texts: List[str]) -> List[int]:
+        keys = [TokenCountCache.hash_text(text) for text in texts]
+        counts = self.cache.get_many(keys)
+
+        missing: Dict[bytes, str] = {
+            key: text
+            for key, text, count in zip(keys, texts, counts)
+            if count is None
+        }
+
+        if missing:
+            computed = dict(zip(
+                missing.keys(),
+                self._encode_lengths(list(missing.values()))
+            ))
+            self.cache.set_many(computed)
+            counts = [
+                computed[key] if count is None else count
+                for key, count in zip(keys, counts)
+            ]
+
+        return counts
 
     def count_text_tokens(self, text: str) -> int:
-        return len(self.encoding.encode(text))
+        return self.count_texts([text])[0]
 
-    def count_message_content_tokens(
+    def count_uncached_tokens(self, text: str) -> int:
+        return len(self.encoding.encode_ordinary(text)) if text else 0
+
+    def _split_content(
         self,
         content: Union[str, List[Union[TextContentPart, ImageContentPart]]]
-    ) -> int:
+    ) -> Tuple[List[str], int]:
         if isinstance(content, str):
-            return self.count_text_tokens(content)
+            return [content], 0
 
-        return sum(
-            self.count_text_tokens(part.text)
-            if part.type == 'text'
-            else self.config.non_text_token_count
-            for part in content
-        )
+        texts = [part.text for part in content if part.type == 'text']
+        return texts, (len(content) - len(texts)) * self.config.non_text_token_count
+
+    def count_message_content_tokens(
+        self,
+        content: Union[str, List[Union[TextContentPart, ImageContentPart]]]
+    ) -> int:
+        texts, non_text_tokens = self._split_content(content)
+        return sum(self.count_texts(texts)) + non_text_tokens
 
     def count_message_tokens(self, message: Union[Message, str]) -> int:
         if isinstance(message, str):
@@ -38,11 +129,86 @@ class TokenCounter:
         return self.count_message_content_tokens(message.content)
 
     def count_request_tokens(self, request: ChatRequest) -> int:
+        texts: List[str] = []
+        non_text_tokens = 0
+
+        for msg in request.messages:
+            message_texts, message_non_text_tokens = self._split_content(msg.content)
+            texts.extend(message_texts)
+            non_text_tokens += message_non_text_tokens
+
+        return sum(self.count_texts(texts)) + non_text_tokens
+
+    def get_request_size(self, request: ChatRequest) -> int:
         return sum(
-            self.count_message_tokens(msg)
+            len(msg.content)
+            if isinstance(msg.content, str)
+            else sum(len(part.text) for part in msg.content if part.type == 'text')
             for msg in request.messages
         )
 
+class StreamUsageAccountant:
+    USAGE_MARKERS = (b'"usage":{', b'"usage": {')
+
+    def __init__(
+        self,
+        token_counter: TokenCounter,
+        config: Optional[TokenizerConfig] = None
+    ):
+        self.token_counter = token_counter
+        self.config = config or token_counter.config
+        self.payloads: List[bytes] = []
+        self.buffered = 0
+        self.counted_tokens = 0
+        self.reported_tokens: Optional[int] = None
+
+    @staticmethod
+    def _extract_text(payload: bytes) -> str:
+        try:
+            chunk = ujson.loads(payload)
+        except ValueError:
+            return ''
+
+        return ''.join(
+            choice.get('delta', {}).get('content') or ''
+            for choice in chunk.get('choices') or []
+        )
+
+    def _count_buffered(self) -> None:
+        text = ''.join(self._extract_text(payload) for payload in self.payloads)
+        self.payloads.clear()
+        self.buffered = 0
+        self.counted_tokens += self.token_counter.count_uncached_tokens(text)
+
+    def add_payload(self, payload: bytes) -> bool:
+        if any(marker in payload for marker in self.USAGE_MARKERS):
+            chunk = ujson.loads(payload)
+            usage = chunk.get('usage') or {}
+
+            if usage.get('completion_tokens') is not None:
+                self.reported_tokens = usage['completion_tokens']
+                self.payloads.clear()
+                self.buffered = 0
+
+            return bool(chunk.get('choices'))
+
+        if self.reported_tokens is None:
+            self.payloads.append(payload)
+            self.buffered += len(payload)
+
+            if self.buffered >= self.config.stream_buffer_limit:
+                self._count_buffered()
+
+        return True
+
+    def finalize(self) -> int:
+        if self.reported_tokens is not None:
+            return self.reported_tokens
+
+        if self.payloads:
+            self._count_buffered()
+        return self.counted_tokens
+
 class APIKeyExtractor:
     def __init__(self, config: Optional[TokenizerConfig] = None):
         self.config = config or TokenizerConfig()
@@ -70,6 +236,9 @@ class RequestProcessor:
     ):
         self.config = config or TokenizerConfig()
         self.token_counter = token_counter or TokenCounter(self.config)
+        self.embeddings_token_counter = TokenCounter(
+            replace(self.config, encoding_name=self.config.embeddings_encoding_name)
+        )
         self.key_extractor = key_extractor or APIKeyExtractor(self.config)
 
     def count_tokens(self, input_data: Union[ChatRequest, str]) -> int:
@@ -77,6 +246,21 @@ class RequestProcessor:
             return self.token_counter.count_request_tokens(input_data)
         return self.token_counter.count_message_tokens(input_data)
 
+    async def count_tokens_async(self, input_data: Union[ChatRequest, str]) -> int:
+        size = (
+            self.token_counter.get_request_size(input_data)
+            if isinstance(input_data, ChatRequest)
+            else len(input_data)
+        )
+
+        if size > self.config.offload_threshold:
+            return await asyncio.to_thread(self.count_tokens, input_data)
+
+        return self.count_tokens(input_data)
+
+    def create_stream_accountant(self) -> StreamUsageAccountant:
+        return StreamUsageAccountant(self.token_counter, self.config)
+
     def get_api_key(self, request: Request) -> str:
         return self.key_extractor.extract_api_key(request)
 
@@ -0,0 +1,4 @@
+import os
+
+os.environ.setdefault('DB_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('WEBHOOK_URL', 'http://localhost/webhook')
\ No newline at end of file
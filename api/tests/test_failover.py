@@ -0,0 +1,63 @@
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from src.api import failover
+from src.api.exceptions import NoProviderAvailableError
+from src.core import circuit_breakers
+from src.providers import ProviderUnavailableError
+
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    circuit_breakers.breakers.clear()
+    yield
+    circuit_breakers.breakers.clear()
+
+def execute(monkeypatch, behaviours, calls, max_attempts=None):
+    async def get_providers(model, vision=False, tools=False):
+        return [{'name': name} for name in behaviours]
+
+    def get_provider_class(name):
+        async def call(request, **payload):
+            calls.append(name)
+            behaviour = behaviours[name]
+            if behaviour == 'unavailable':
+                raise ProviderUnavailableError(name, 'model')
+            if behaviour == 'error':
+                raise httpx.ConnectError('connection refused')
+            return SimpleNamespace(status_code=behaviour)
+
+        return SimpleNamespace(call=call)
+
+    monkeypatch.setattr(failover.provider_manager, 'get_providers', get_providers)
+    monkeypatch.setattr(failover.BaseProvider, 'get_provider_class', staticmethod(get_provider_class))
+
+    engine = failover.FailoverEngine(failover.FailoverConfig(backoff_base=0, backoff_max=0))
+    request = SimpleNamespace(state=SimpleNamespace())
+    return asyncio.run(engine.execute(request, 'call', 'model', {}, max_attempts=max_attempts))
+
+def test_walks_candidates_in_ranked_order(monkeypatch):
+    calls = []
+    response = execute(monkeypatch, {'a': 500, 'b': 'unavailable', 'c': 500, 'd': 200}, calls, max_attempts=3)
+
+    assert calls == ['a', 'b', 'c', 'd']
+    assert response.status_code == 200
+
+def test_open_breaker_does_not_use_the_only_attempt(monkeypatch):
+    breaker = circuit_breakers.provider('a')
+    while breaker.allow_request():
+        breaker.record(False, 0.0)
+
+    calls = []
+    response = execute(monkeypatch, {'a': 200, 'b': 200}, calls, max_attempts=1)
+
+    assert calls == ['b']
+    assert response.status_code == 200
+
+def test_transport_errors_count_as_attempts(monkeypatch):
+    calls = []
+    with pytest.raises(NoProviderAvailableError):
+        execute(monkeypatch, {'a': 'error', 'b': 'error', 'c': 'error'}, calls, max_attempts=2)
+
+    assert calls == ['a', 'b']
+    assert circuit_breakers.provider('a').get_stats()['errors'] == 1
\ No newline at end of file
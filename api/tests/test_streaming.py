@@ -0,0 +1,178 @@
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from src.core import circuit_breakers, metrics, provider_manager, sub_provider_manager, user_manager
+from src.providers.openai import OpenAI
+
+API_KEY = 'sk-test'
+CHUNK = b'data: {"id":"c","choices":[{"index":0,"delta":{"content":"hi"}}]}\n\n'
+
+class HangingStream(httpx.AsyncByteStream):
+    def __init__(self):
+        self.closed = False
+
+    async def __aiter__(self):
+        yield CHUNK
+        await asyncio.Event().wait()
+
+    async def aclose(self) -> None:
+        await asyncio.sleep(0)
+        self.closed = True
+
+class BrokenStream(HangingStream):
+    async def __aiter__(self):
+        yield CHUNK
+        raise httpx.ReadError('connection reset')
+
+class HangingAudioStream(HangingStream):
+    async def __aiter__(self):
+        yield b'\0' * OpenAI.api_config.speech_chunk_size
+        await asyncio.Event().wait()
+
+async def noop(*args, **kwargs) -> None:
+    pass
+
+def make_request() -> SimpleNamespace:
+    return SimpleNamespace(state=SimpleNamespace(
+        user={'user_id': 1, 'credits': 1000},
+        token_count=10,
+        model='gpt-4o-mini',
+        provider={'name': OpenAI.config.name}
+    ))
+
+async def run_until_disconnect(response) -> None:
+    sent_body = asyncio.Event()
+
+    async def receive():
+        await sent_body.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            sent_body.set()
+
+    await response({'type': 'http'}, receive, send)
+
+def patch_upstream(monkeypatch, stream: httpx.AsyncByteStream) -> list:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(
+        lambda request: httpx.Response(200, stream=stream, headers={'content-type': 'text/event-stream'})
+    ))
+    flushed = []
+
+    async def flush_credits(user_id=None):
+        flushed.append(user_id)
+
+    monkeypatch.setattr(OpenAI, 'client', property(lambda self: client))
+    monkeypatch.setattr(provider_manager, 'record_usage', noop)
+    monkeypatch.setattr(sub_provider_manager, 'record_usage', noop)
+    monkeypatch.setattr(user_manager, 'flush_credits', flush_credits)
+    monkeypatch.setattr(user_manager, 'deduct_credits', lambda user_id, amount: None)
+    return flushed
+
+async def open_stream(request: SimpleNamespace):
+    sub_provider_manager.pool.in_flight[API_KEY] = 1
+
+    return await OpenAI()._handle_streaming_chat(
+        request=request,
+        model='gpt-4o-mini',
+        messages=[{'role': 'user', 'content': 'hi'}],
+        sub_provider={'api_key': API_KEY},
+        start=0
+    )
+
+def active_streams() -> float:
+    return metrics.active_streams.values.get((OpenAI.config.name,), 0)
+
+def test_client_disconnect_settles_stream(monkeypatch):
+    stream = HangingStream()
+    flushed = patch_upstream(monkeypatch, stream)
+
+    async def main():
+        request = make_request()
+        streams = active_streams()
+
+        response = await open_stream(request)
+        await asyncio.wait_for(run_until_disconnect(response), 5)
+        await asyncio.gather(*OpenAI.closing)
+
+        assert API_KEY not in sub_provider_manager.pool.in_flight
+        assert active_streams() == streams
+        assert request.state.user['credits'] < 1000 - 10
+        assert flushed == [1]
+        assert stream.closed
+
+    asyncio.run(main())
+
+def test_abandoned_stream_releases_sub_provider(monkeypatch):
+    stream = HangingStream()
+    flushed = patch_upstream(monkeypatch, stream)
+
+    async def main():
+        streams = active_streams()
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(message):
+            raise OSError('client went away')
+
+        response = await open_stream(make_request())
+        with pytest.raises(OSError):
+            await asyncio.wait_for(response({'type': 'http'}, receive, send), 5)
+        await asyncio.gather(*OpenAI.closing)
+
+        assert API_KEY not in sub_provider_manager.pool.in_flight
+        assert active_streams() == streams
+        assert flushed == [1]
+        assert stream.closed
+
+    asyncio.run(main())
+
+def test_interrupted_stream_records_key_breaker_once(monkeypatch):
+    patch_upstream(monkeypatch, BrokenStream())
+    monkeypatch.setattr(OpenAI, '_handle_error', noop)
+    circuit_breakers.remove(f'key:{API_KEY}')
+
+    async def main():
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(message):
+            pass
+
+        response = await open_stream(make_request())
+        await asyncio.wait_for(response({'type': 'http'}, receive, send), 5)
+        await asyncio.gather(*OpenAI.closing)
+
+        stats = circuit_breakers.key(API_KEY).get_stats()
+        assert stats['requests'] == 1
+        assert stats['errors'] == 1
+
+    asyncio.run(main())
+
+def test_speech_disconnect_charges_and_releases(monkeypatch):
+    stream = HangingAudioStream()
+    flushed = patch_upstream(monkeypatch, stream)
+
+    async def main():
+        request = make_request()
+        streams = active_streams()
+        sub_provider_manager.pool.in_flight[API_KEY] = 1
+
+        instance = OpenAI()
+        upstream = await instance.client.send(
+            instance.client.build_request('POST', f'{instance.api_config.api_base_url}/audio/speech'),
+            stream=True
+        )
+        response = instance._stream_speech(request, 'tts-1', {'api_key': API_KEY}, upstream, 0, 'mp3')
+        await asyncio.wait_for(run_until_disconnect(response), 5)
+        await asyncio.gather(*OpenAI.closing)
+
+        assert API_KEY not in sub_provider_manager.pool.in_flight
+        assert active_streams() == streams
+        assert request.state.user['credits'] == 1000 - 10
+        assert flushed == [1]
+        assert stream.closed
+
+    asyncio.run(main())
\ No newline at end of file
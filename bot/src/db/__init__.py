@@ -1,4 +1,5 @@
 
 from .user_manager import UserManager
+from .indexes import IndexManager
 
-__all__ = ['UserManager']
\ No newline at end of file
+__all__ = ['UserManager', 'IndexManager']
\ No newline at end of file
@@ -0,0 +1,32 @@
+from pymongo import IndexModel, ASCENDING
+from motor.motor_asyncio import AsyncIOMotorClient
+from typing import List
+from .exceptions import DatabaseError
+from ..config import settings
+
+USER_INDEXES = [
+    IndexModel([('key', ASCENDING)], name='key_1'),
+    IndexModel([('user_id', ASCENDING)], name='user_id_1')
+]
+
+class IndexManager:
+    def __init__(self):
+        self.client = AsyncIOMotorClient(settings.db_url)
+        self.collection = self.client['db']['users']
+
+    async def ensure_indexes(self) -> List[str]:
+        try:
+            existing = await self.collection.index_information()
+            existing_keys = [info['key'] for info in existing.values()]
+
+            missing = [
+                index for index in USER_INDEXES
+                if index.document['name'] not in existing
+                and list(index.document['key'].items()) not in existing_keys
+            ]
+
+            return await self.collection.create_indexes(missing) if missing else []
+        except Exception as e:
+            raise DatabaseError(f'Failed to ensure indexes: {str(e)}')
+        finally:
+            self.client.close()
\ No newline at end of file
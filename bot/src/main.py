@@ -1,6 +1,7 @@
 import os
 import discord
 from discord.ext import commands
+from .db import IndexManager
 
 class DiscordBot(commands.Bot):
     def __init__(self) -> None:
@@ -15,6 +16,7 @@ class DiscordBot(commands.Bot):
                 await self.load_extension(f'src.cogs.{file[:-3]}')
                 
     async def setup_hook(self) -> None:
+        await IndexManager().ensure_indexes()
         await self.load_cogs()
         await self.tree.sync()
         print(f'Logged in as {self.user} (ID: {self.user.id})')
\ No newline at end of file